@@ -8,9 +8,11 @@ Create shows like AI House with character voices, AI video, and multi-platform o
 
 import streamlit as st
 from pathlib import Path
-import json
+from itertools import islice
 import os
 
+from utils.state import get_characters, get_shows, upsert_character
+
 # Page config
 st.set_page_config(
     page_title="The Show Runner",
@@ -30,23 +32,9 @@ DATA_DIR.mkdir(exist_ok=True)
 CHARACTERS_DIR.mkdir(exist_ok=True)
 OUTPUTS_DIR.mkdir(exist_ok=True)
 
-# Load or initialize data
-def load_json(path, default=None):
-    if path.exists():
-        with open(path) as f:
-            return json.load(f)
-    return default or {}
-
-def save_json(path, data):
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
-
-# Initialize session state
-if "characters" not in st.session_state:
-    st.session_state.characters = load_json(DATA_DIR / "characters.json", {})
-
-if "shows" not in st.session_state:
-    st.session_state.shows = load_json(DATA_DIR / "shows.json", {})
+# Roster and shows come from the shared cache, not per-session copies
+characters = get_characters()
+shows = get_shows()
 
 # Sidebar
 with st.sidebar:
@@ -57,8 +45,8 @@ with st.sidebar:
     st.divider()
     
     # Quick stats
-    st.metric("Characters", len(st.session_state.characters))
-    st.metric("Shows", len(st.session_state.shows))
+    st.metric("Characters", len(characters))
+    st.metric("Shows", len(shows))
     
     st.divider()
     
@@ -89,11 +77,11 @@ col1, col2, col3 = st.columns(3)
 
 with col1:
     st.markdown("### 📸 Characters")
-    if st.session_state.characters:
-        for name, char in list(st.session_state.characters.items())[:3]:
+    if characters:
+        for name, char in islice(characters.items(), 3):
             st.markdown(f"- **{char.get('name', name)}** - {char.get('role', 'Character')}")
-        if len(st.session_state.characters) > 3:
-            st.caption(f"+ {len(st.session_state.characters) - 3} more...")
+        if len(characters) > 3:
+            st.caption(f"+ {len(characters) - 3} more...")
     else:
         st.info("No characters yet. Add some!")
     
@@ -102,11 +90,11 @@ with col1:
 
 with col2:
     st.markdown("### 💡 Shows")
-    if st.session_state.shows:
-        for show_id, show in list(st.session_state.shows.items())[:3]:
+    if shows:
+        for show_id, show in islice(shows.items(), 3):
             st.markdown(f"- **{show.get('title', 'Untitled')}**")
-        if len(st.session_state.shows) > 3:
-            st.caption(f"+ {len(st.session_state.shows) - 3} more...")
+        if len(shows) > 3:
+            st.caption(f"+ {len(shows) - 3} more...")
     else:
         st.info("No shows yet. Create one!")
     
@@ -115,10 +103,11 @@ with col2:
 
 with col3:
     st.markdown("### 🎥 Recent Productions")
-    outputs = list(OUTPUTS_DIR.glob("*/"))
+    with os.scandir(OUTPUTS_DIR) as entries:
+        outputs = list(islice((e.name for e in entries if e.is_dir()), 3))
     if outputs:
-        for output in outputs[:3]:
-            st.markdown(f"- {output.name}")
+        for output in outputs:
+            st.markdown(f"- {output}")
     else:
         st.info("No productions yet.")
     
@@ -184,7 +173,11 @@ if st.button("📥 Import AI House Characters"):
         }
     }
     
-    st.session_state.characters.update(ai_house_chars)
-    save_json(DATA_DIR / "characters.json", st.session_state.characters)
-    st.success("✅ Imported 5 AI House characters!")
-    st.rerun()
+    needs_update = any(characters.get(k) != v for k, v in ai_house_chars.items())
+    if not needs_update:
+        st.info("AI House characters are already imported.")
+    else:
+        for char_id, char in ai_house_chars.items():
+            upsert_character(char_id, char)
+        st.success("✅ Imported 5 AI House characters!")
+        st.rerun()
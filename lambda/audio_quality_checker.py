@@ -14,47 +14,126 @@ Returns:
 """
 
 import json
-import boto3
 import os
-import tempfile
+import re
+import shutil
 import subprocess
-from urllib.request import urlretrieve
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.client import IncompleteRead
+from urllib.request import urlopen
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Resolved once per container; /opt/bin is where the ffmpeg Lambda layer installs it
+_FFMPEG = shutil.which('ffmpeg') or '/opt/bin/ffmpeg'
+
+# Matches both "silence_start: 12.3" and "silence_end: 17.8" lines
+_SILENCE_RE = re.compile(rb'silence_(start|end): ([\d.]+)')
+
+# Scripts shorter than this, or with no digits (no dates/years to verify), skip the API call
+_MIN_FACT_CHECK_CHARS = 200
+
+_FACT_CHECK_PROMPT = """Fact-check this biography script. Look for:
+1. Incorrect dates or years
+2. Wrong facts about the person
+3. Misattributed quotes or achievements
+4. Historical inaccuracies
+
+If you find errors, list each one clearly.
+If everything is accurate, respond with just: VERIFIED
+
+Script:
+"""
+
+# Reused across warm invocations so the TLS connection to Perplexity stays open
+_SESSION = requests.Session()
+_SESSION.headers.update({"Content-Type": "application/json"})
+_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+def _pump(src, dst, errors):
+    """
+    Copy the HTTP body into ffmpeg's stdin, then close it to signal EOF.
+    Download failures are appended to errors so the caller can re-raise them;
+    a truncated body must fail the check, not be scanned as if complete.
+    """
+    try:
+        while True:
+            try:
+                chunk = src.read(shutil.COPY_BUFSIZE)
+                if not chunk and src.length:
+                    # read(amt) returns b"" on a dropped connection; the
+                    # bytes still owed by Content-Length expose the truncation
+                    raise IncompleteRead(b"", src.length)
+            except Exception as e:
+                errors.append(e)
+                return
+            if not chunk:
+                return
+            try:
+                dst.write(chunk)
+            except BrokenPipeError:
+                return  # ffmpeg exited early; the caller checks its exit code
+    finally:
+        try:
+            dst.close()
+        except BrokenPipeError:
+            pass
 
 def analyze_audio_for_gaps(audio_url, min_gap_seconds=5):
     """
-    Download audio and use ffmpeg to detect silence gaps.
+    Stream audio into ffmpeg and detect silence gaps.
     Returns list of gaps >= min_gap_seconds.
     """
     issues = []
     
     try:
-        # Download audio to temp file
-        with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as f:
-            temp_path = f.name
-            urlretrieve(audio_url, temp_path)
-        
-        # Use ffmpeg silencedetect filter
+        # Use ffmpeg silencedetect filter, reading the audio from stdin
+        # -vn skips any cover-art/video stream; pcm_s32le avoids encoder setup in the null muxer
         cmd = [
-            'ffmpeg', '-i', temp_path,
+            _FFMPEG, '-hide_banner', '-loglevel', 'info',
+            '-threads', '0', '-i', 'pipe:0', '-vn',
             '-af', f'silencedetect=noise=-50dB:d={min_gap_seconds}',
-            '-f', 'null', '-'
+            '-c:a', 'pcm_s32le', '-f', 'null', '-'
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        stderr = result.stderr
-        
-        # Parse silence detection output
-        import re
-        silence_starts = re.findall(r'silence_start: ([\d.]+)', stderr)
-        silence_ends = re.findall(r'silence_end: ([\d.]+)', stderr)
-        
-        for i, (start, end) in enumerate(zip(silence_starts, silence_ends)):
-            duration = float(end) - float(start)
-            if duration >= min_gap_seconds:
-                issues.append(f"Silence gap of {duration:.1f}s at {float(start):.1f}s")
+        with urlopen(audio_url) as response:
+            proc = subprocess.Popen(
+                cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE
+            )
+            # Download and decode overlap: the body is streamed into ffmpeg
+            download_errors = []
+            writer = threading.Thread(target=_pump, args=(response, proc.stdin, download_errors), daemon=True)
+            writer.start()
+            
+            # Stream stderr and parse silence events as ffmpeg emits them
+            last_start = None
+            for line in proc.stderr:
+                match = _SILENCE_RE.search(line)
+                if not match:
+                    continue
+                kind, value = match.groups()
+                if kind == b'start':
+                    last_start = float(value)
+                elif last_start is not None:
+                    duration = float(value) - last_start
+                    if duration >= min_gap_seconds:
+                        issues.append(f"Silence gap of {duration:.1f}s at {last_start:.1f}s")
+                    last_start = None
+            proc.wait()
+            writer.join()
         
-        # Cleanup
-        os.unlink(temp_path)
+        if download_errors:
+            raise download_errors[0]
+        if proc.returncode != 0:
+            issues.append(f"Audio analysis error: ffmpeg exited with code {proc.returncode}")
         
     except Exception as e:
         issues.append(f"Audio analysis error: {str(e)}")
@@ -68,39 +147,31 @@ def fact_check_script(script_text, perplexity_api_key):
     """
     issues = []
     
+    if len(script_text.strip()) < _MIN_FACT_CHECK_CHARS or not any(c.isdigit() for c in script_text):
+        return issues
+    
+    script_trunc = script_text[:8000]
+    payload = {
+        "model": "sonar",
+        "messages": [
+            {"role": "user", "content": _FACT_CHECK_PROMPT + script_trunc}
+        ]
+    }
+    # Encode once ourselves; the session already sends Content-Type: application/json
+    body = orjson.dumps(payload) if orjson else json.dumps(payload).encode()
+    
     try:
-        import requests
-        
-        response = requests.post(
+        response = _SESSION.post(
             "https://api.perplexity.ai/chat/completions",
             headers={
-                "Authorization": f"Bearer {perplexity_api_key}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": "sonar",
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": f"""Fact-check this biography script. Look for:
-1. Incorrect dates or years
-2. Wrong facts about the person
-3. Misattributed quotes or achievements
-4. Historical inaccuracies
-
-If you find errors, list each one clearly.
-If everything is accurate, respond with just: VERIFIED
-
-Script:
-{script_text[:8000]}"""
-                    }
-                ]
+                "Authorization": f"Bearer {perplexity_api_key}"
             },
+            data=body,
             timeout=30
         )
         
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content) if orjson else response.json()
             content = result['choices'][0]['message']['content']
             
             if 'VERIFIED' not in content.upper():
@@ -138,22 +209,31 @@ def handler(event, context):
         "message": ""
     }
     
-    # Check audio for gaps
-    if audio_url:
-        audio_issues = analyze_audio_for_gaps(audio_url, min_gap_seconds=5)
-        results["audio_issues"] = audio_issues
-        if audio_issues:
-            results["passed"] = False
-            results["should_post"] = False
-    
-    # Fact-check script
-    if script_text and perplexity_key:
-        fact_issues = fact_check_script(script_text, perplexity_key)
-        results["fact_check_issues"] = fact_issues
-        if fact_issues and "VERIFIED" not in str(fact_issues).upper():
-            results["passed"] = False
-            # Still allow posting but flag for review
-            results["message"] = "Fact-check flagged potential issues - review recommended"
+    # Audio check (ffmpeg) and fact-check (HTTP) are independent, so run them concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        audio_future = None
+        fact_future = None
+        if audio_url:
+            audio_future = executor.submit(analyze_audio_for_gaps, audio_url, min_gap_seconds=5)
+        if script_text and perplexity_key:
+            fact_future = executor.submit(fact_check_script, script_text, perplexity_key)
+        
+        # Check audio for gaps
+        if audio_future:
+            audio_issues = audio_future.result()
+            results["audio_issues"] = audio_issues
+            if audio_issues:
+                results["passed"] = False
+                results["should_post"] = False
+        
+        # Fact-check script
+        if fact_future:
+            fact_issues = fact_future.result()
+            results["fact_check_issues"] = fact_issues
+            if fact_issues and "VERIFIED" not in str(fact_issues).upper():
+                results["passed"] = False
+                # Still allow posting but flag for review
+                results["message"] = "Fact-check flagged potential issues - review recommended"
     
     # Summary message
     if not results["passed"]:
@@ -5,51 +5,194 @@ Manage your talent roster with reference images and voice settings.
 
 import streamlit as st
 from pathlib import Path
-import json
+import base64
+import io
 import shutil
-import requests
 import os
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+
+from utils.http import anthropic_messages, http_session
+from utils.keys import get_api_key
+from utils.models import Character
+from utils.serialization import loads, write_text_atomic
+from utils.state import characters_version, delete_character, get_characters, upsert_character
 
 APP_DIR = Path(__file__).parent.parent
 DATA_DIR = APP_DIR / "data"
 CHARACTERS_DIR = APP_DIR / "characters"
 OUTPUTS_DIR = APP_DIR / "outputs"
 
+# Hume voice presets; the selectbox labels add a leading "Custom" entry that keeps the manually entered ID
+_HUME_PRESETS = (
+    ("Female QP-1", "d4e78913-ca08-40fc-89a2-c5d2eb27133d"),
+    ("Male QP-1", "98bd98d4-0a8b-4abd-8933-c03b6c8b5321"),
+    ("Claire Delish", "09eccfe9-8068-42c3-8f0a-e91f5d50d160"),
+    ("Olly Bennett", "de25054e-a18d-41d7-93f3-d9fb6fb63078"),
+    ("VV Steele", "d513161a-3be9-4eaa-9612-711f77268b63"),
+    ("Pennie Power", "240fb214-35c0-4c46-ad08-ac16fe48499b"),
+    ("Roxie Rush", "33e57cc2-1727-465b-ab0f-8ac4bca82e9b"),
+)
+_HUME_PRESET_LABELS = ["Custom (enter ID above)"] + [f"{name}: {uuid}" for name, uuid in _HUME_PRESETS]
+_HUME_PRESET_LOOKUP = {f"{name}: {uuid}": uuid for name, uuid in _HUME_PRESETS}
+
+# Quick Video script prompt, filled once per Generate click
+_SCRIPT_TEMPLATE = """Write a short video script for {name}.
+
+**Character:** {name}
+**Role:** {role}
+**Description:** {description}
+
+**Topic:** {topic}
+**Tone:** {tone}
+**Target Duration:** {duration}
+
+Write the script as direct dialogue - what the character says to camera. 
+No stage directions, just the spoken words.
+Make it sound natural, conversational, and true to the character.
+Include personality, catchphrases, and authentic voice.
+
+Script:"""
+
 DATA_DIR.mkdir(exist_ok=True)
 CHARACTERS_DIR.mkdir(exist_ok=True)
 OUTPUTS_DIR.mkdir(exist_ok=True)
 
-def load_json(path, default=None):
-    if path.exists():
-        with open(path) as f:
-            return json.load(f)
-    return default or {}
+def save_upload(uploaded_file, path):
+    """Stream an uploaded file to disk in 1 MB chunks instead of one getvalue() copy."""
+    uploaded_file.seek(0)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        shutil.copyfileobj(uploaded_file, f, length=1024 * 1024)
+    os.replace(tmp_path, path)
+
+def store_image(uploaded_file, char_id):
+    """
+    Save an upload and its thumbnail before the rerun, so the card shows the
+    new image straight away. Failures are reported; returns False if the
+    image couldn't be saved.
+    """
+    img_path = CHARACTERS_DIR / f"{char_id}.png"
+    try:
+        with st.spinner("Saving image..."):
+            save_upload(uploaded_file, img_path)
+            thumbnailed = write_thumbnail(img_path)
+    except OSError as e:
+        st.error(f"❌ Couldn't save the image: {e}")
+        return False
+    if not thumbnailed:
+        st.warning("⚠️ Image saved, but it couldn't be read for a preview")
+    return True
 
-def save_json(path, data):
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+def stream_to_file(response, path, chunk_size=64 * 1024):
+    """Write a stream=True response body to disk without buffering it in memory."""
+    with response, open(path, "wb") as f:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            f.write(chunk)
 
-def get_api_key(service):
-    """Get API key from Streamlit secrets or local files"""
-    # Try Streamlit secrets first
+def post_to_file(session, url, path, **kwargs):
+    """POST with stream=True, writing a 200 body to path; error bodies stay readable."""
+    response = session.post(url, stream=True, **kwargs)
+    if response.status_code == 200:
+        stream_to_file(response, path)
+    else:
+        response.content  # load the error body and release the connection
+    return response
+
+# Pillow errors for files it can't read or re-encode (corrupt, truncated, oversized)
+_IMAGE_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+def _png_ready(im):
+    """PNG can't store modes like CMYK (a common JPEG upload), so convert those first."""
+    if im.mode in ("RGB", "RGBA", "L"):
+        return im
+    return im.convert("RGBA" if "A" in im.getbands() or "transparency" in im.info else "RGB")
+
+def write_thumbnail(img_path, size=300):
+    """
+    Write a pre-sized {char_id}_thumb.png next to the original image.
+    If the image can't be thumbnailed, any stale thumbnail is removed so
+    the original is shown instead; returns whether a thumbnail was written.
+    """
+    out_path = img_path.with_name(f"{img_path.stem}_thumb.png")
+    tmp_path = out_path.with_suffix(".png.tmp")
     try:
-        return st.secrets.get("api_keys", {}).get(service)
-    except:
-        pass
-    
-    # Try local secrets file
-    secrets_dir = Path(os.path.expanduser("~/clawd/.secrets"))
-    key_file = secrets_dir / f"{service}.json"
-    if key_file.exists():
-        with open(key_file) as f:
-            data = json.load(f)
-            return data.get("api_key") or data.get("key")
-    return None
-
-# Load characters
-if "characters" not in st.session_state:
-    st.session_state.characters = load_json(DATA_DIR / "characters.json", {})
+        with Image.open(img_path) as im:
+            im.thumbnail((size, size))
+            _png_ready(im).save(tmp_path, "PNG")
+    except _IMAGE_ERRORS:
+        tmp_path.unlink(missing_ok=True)
+        out_path.unlink(missing_ok=True)
+        return False
+    os.replace(tmp_path, out_path)
+    return True
+
+def thumb_path(char_id):
+    """Prefer the pre-sized thumbnail, falling back to the original upload."""
+    path = CHARACTERS_DIR / f"{char_id}_thumb.png"
+    return path if path.exists() else CHARACTERS_DIR / f"{char_id}.png"
+
+def _make_thumb(path_str, size=150):
+    """Return a PNG thumbnail as a data URI, or None if the image can't be read."""
+    try:
+        with Image.open(path_str) as im:
+            im.thumbnail((size, size))
+            buf = io.BytesIO()
+            _png_ready(im).save(buf, "PNG")
+    except _IMAGE_ERRORS:
+        return None
+    return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode()
+
+# Thumbnails are cached per (char_id, path, mtime_ns) set, so re-uploads invalidate them.
+# Pillow releases the GIL while decoding, so a thread pool reads and scales in parallel.
+# Unreadable images map to None and the card shows the placeholder.
+@st.cache_data(show_spinner=False)
+def roster_thumbs(images, size=150):
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        thumbs = executor.map(lambda image: _make_thumb(image[1], size), images)
+        return {image[0]: thumb for image, thumb in zip(images, thumbs)}
+
+@st.cache_data(show_spinner=False)
+def thumb_data_uri(path_str, mtime_ns, size=150):
+    return _make_thumb(path_str, size)
+
+@st.cache_data(show_spinner=False)
+def load_roster(version):
+    """Characters as typed records, rebuilt only when the roster changes"""
+    return {cid: Character.from_dict(cid, data) for cid, data in get_characters().items()}
+
+@st.cache_data(show_spinner=False)
+def char_options(version):
+    """Selectbox labels, ids and label -> id lookup, rebuilt only when the roster changes"""
+    chars = load_roster(version)
+    labels = [f"{c.display_name} ({cid})" for cid, c in chars.items()]
+    ids = list(chars)
+    return labels, ids, dict(zip(labels, ids))
+
+def _mark_rerun():
+    # Handlers only flag the rerun; it fires once, after all state changes
+    st.session_state._needs_rerun = True
+
+def _flush_rerun():
+    if st.session_state.pop("_needs_rerun", False):
+        st.rerun()
+
+def upload_data_uri(uploaded_file):
+    # The browser already has these bytes; inline them rather than round-trip through st.image
+    return f"data:{uploaded_file.type};base64,{base64.b64encode(uploaded_file.getvalue()).decode()}"
+
+def show_img(data_uri, width):
+    # A plain <img> skips st.image's media pipeline for images we've already encoded;
+    # lazy/async lets the browser defer decoding cards scrolled off-screen
+    st.markdown(
+        f'<img src="{data_uri}" width="{width}" loading="lazy" decoding="async">',
+        unsafe_allow_html=True
+    )
+
+# Characters are read through the shared mtime-keyed cache rather than
+# copied into every session; writes go straight to the journal
+characters = load_roster(characters_version())
 
 st.title("📸 Characters")
 st.markdown("Manage your talent roster — click any character to create content!")
@@ -57,51 +200,72 @@ st.markdown("Manage your talent roster — click any character to create content
 # Tabs
 tab1, tab2, tab3 = st.tabs(["👥 Roster", "➕ Add Character", "⚡ Quick Video"])
 
-with tab1:
-    if not st.session_state.characters:
+# Roster grid runs as a fragment so it only re-renders on its own
+# interactions; its buttons still rerun the full app, once, at the end
+@st.fragment
+def _render_roster():
+    characters = load_roster(characters_version())
+    if not characters:
         st.info("No characters yet. Add some in the 'Add Character' tab!")
     else:
+        # One directory scan instead of an exists() call per character
+        with os.scandir(CHARACTERS_DIR) as entries:
+            image_entries = {e.name: e for e in entries if e.is_file()}
+        images = tuple(
+            (char_id, entry.path, entry.stat().st_mtime_ns)
+            for char_id in characters
+            if (entry := image_entries.get(f"{char_id}_thumb.png") or image_entries.get(f"{char_id}.png"))
+        )
+        thumbs = roster_thumbs(images)
+        
         # Display characters in a grid
         cols = st.columns(3)
-        for i, (char_id, char) in enumerate(st.session_state.characters.items()):
+        for i, (char_id, char) in enumerate(characters.items()):
             with cols[i % 3]:
                 with st.container(border=True):
                     # Character image
-                    img_path = CHARACTERS_DIR / f"{char_id}.png"
-                    if img_path.exists():
-                        st.image(str(img_path), width=150)
+                    thumb = thumbs.get(char_id)
+                    if thumb:
+                        show_img(thumb, 150)
                     else:
                         st.markdown("🎭")
                     
-                    st.markdown(f"### {char.get('name', char_id)}")
-                    st.caption(char.get('role', 'Character'))
+                    st.markdown(f"### {char.display_name}")
+                    st.caption(char.role or 'Character')
                     
-                    if char.get('description'):
-                        st.markdown(f"_{char['description'][:100]}..._" if len(char.get('description', '')) > 100 else f"_{char.get('description')}_")
+                    desc = char.description
+                    if desc:
+                        st.markdown(f"_{desc[:100]}..._" if len(desc) > 100 else f"_{desc}_")
                     
                     # Voice info
-                    voice_provider = char.get('voice_provider', 'none')
-                    if voice_provider != 'none':
-                        st.markdown(f"🎤 **Voice:** {voice_provider.title()}")
+                    if char.voice_provider != 'none':
+                        st.markdown(f"🎤 **Voice:** {char.voice_provider.title()}")
                     
                     # Actions - now with MAKE VIDEO as primary action
                     col1, col2, col3 = st.columns(3)
                     with col1:
                         if st.button("🎬 Video", key=f"video_{char_id}", use_container_width=True, type="primary"):
                             st.session_state.quick_video_char = char_id
-                            st.rerun()
+                            _mark_rerun()
                     with col2:
                         if st.button("✏️", key=f"edit_{char_id}", use_container_width=True):
                             st.session_state.editing_char = char_id
-                            st.rerun()
+                            _mark_rerun()
                     with col3:
                         if st.button("🗑️", key=f"del_{char_id}", use_container_width=True):
-                            del st.session_state.characters[char_id]
-                            save_json(DATA_DIR / "characters.json", st.session_state.characters)
-                            st.rerun()
+                            delete_character(char_id)
+                            _mark_rerun()
+        
+        # Fragment reruns never reach the module bottom, so flush here too
+        _flush_rerun()
+
+with tab1:
+    _render_roster()
 
 with tab2:
     st.markdown("### Add New Character")
+    # Lives outside the form so flipping it doesn't wait for a submit
+    show_preview = st.toggle("Show image preview", value=True)
     
     with st.form("add_character"):
         col1, col2 = st.columns([1, 2])
@@ -109,8 +273,8 @@ with tab2:
         with col1:
             # Reference image upload
             uploaded_file = st.file_uploader("Reference Image", type=['png', 'jpg', 'jpeg', 'webp'])
-            if uploaded_file:
-                st.image(uploaded_file, width=200)
+            if uploaded_file and show_preview:
+                show_img(upload_data_uri(uploaded_file), 200)
         
         with col2:
             char_id = st.text_input("Character ID", placeholder="claire_delish", help="Lowercase, no spaces")
@@ -130,45 +294,31 @@ with tab2:
         # Hume voice presets
         if voice_provider == "hume":
             st.markdown("**QP-1 Custom Voices:**")
-            preset = st.selectbox("Or select preset", [
-                "Custom (enter ID above)",
-                "Female QP-1: d4e78913-ca08-40fc-89a2-c5d2eb27133d",
-                "Male QP-1: 98bd98d4-0a8b-4abd-8933-c03b6c8b5321",
-                "Claire Delish: 09eccfe9-8068-42c3-8f0a-e91f5d50d160",
-                "Olly Bennett: de25054e-a18d-41d7-93f3-d9fb6fb63078",
-                "VV Steele: d513161a-3be9-4eaa-9612-711f77268b63",
-                "Pennie Power: 240fb214-35c0-4c46-ad08-ac16fe48499b",
-                "Roxie Rush: 33e57cc2-1727-465b-ab0f-8ac4bca82e9b",
-            ])
-            if preset != "Custom (enter ID above)":
-                voice_id = preset.split(": ")[1]
+            preset = st.selectbox("Or select preset", _HUME_PRESET_LABELS)
+            voice_id = _HUME_PRESET_LOOKUP.get(preset, voice_id)
         
         submitted = st.form_submit_button("💾 Save Character", use_container_width=True)
         
         if submitted:
             if not char_id:
                 st.error("Character ID is required!")
-            elif char_id in st.session_state.characters:
+            elif char_id in characters:
                 st.error("Character ID already exists!")
             else:
                 # Save character data
-                st.session_state.characters[char_id] = {
+                upsert_character(char_id, {
                     "name": char_name or char_id,
                     "role": char_role,
                     "description": char_desc,
                     "voice_provider": voice_provider,
                     "voice_id": voice_id
-                }
-                save_json(DATA_DIR / "characters.json", st.session_state.characters)
-                
-                # Save image if uploaded
-                if uploaded_file:
-                    img_path = CHARACTERS_DIR / f"{char_id}.png"
-                    with open(img_path, "wb") as f:
-                        f.write(uploaded_file.getvalue())
+                })
                 
                 st.success(f"✅ Added {char_name or char_id}!")
-                st.rerun()
+                
+                # Save image if uploaded; on failure stay put so the error is visible
+                if not uploaded_file or store_image(uploaded_file, char_id):
+                    _mark_rerun()
 
 with tab3:
     st.markdown("### ⚡ Quick Video Generator")
@@ -178,35 +328,34 @@ with tab3:
     selected_char_id = st.session_state.get('quick_video_char', None)
     
     # Character selector
-    if st.session_state.characters:
-        char_options = {f"{c.get('name', cid)} ({cid})": cid for cid, c in st.session_state.characters.items()}
+    if characters:
+        labels, ids, label_to_id = char_options(characters_version())
         
         # Set default if coming from roster
         default_idx = 0
-        if selected_char_id and selected_char_id in st.session_state.characters:
-            char_list = list(char_options.values())
-            if selected_char_id in char_list:
-                default_idx = char_list.index(selected_char_id)
+        if selected_char_id and selected_char_id in ids:
+            default_idx = ids.index(selected_char_id)
         
         selected_char_name = st.selectbox(
             "Select Character", 
-            list(char_options.keys()),
+            labels,
             index=default_idx
         )
-        char_id = char_options[selected_char_name]
-        char = st.session_state.characters[char_id]
+        char_id = label_to_id[selected_char_name]
+        char = characters[char_id]
         
         # Show selected character
         col1, col2 = st.columns([1, 2])
         with col1:
-            img_path = CHARACTERS_DIR / f"{char_id}.png"
-            if img_path.exists():
-                st.image(str(img_path), width=150)
+            img_path = thumb_path(char_id)
+            thumb = thumb_data_uri(str(img_path), img_path.stat().st_mtime_ns) if img_path.exists() else None
+            if thumb:
+                show_img(thumb, 150)
             else:
                 st.markdown("🎭")
-            st.markdown(f"**{char.get('name', char_id)}**")
-            st.caption(char.get('role', ''))
-            if char.get('voice_id'):
+            st.markdown(f"**{char.display_name}**")
+            st.caption(char.role)
+            if char.voice_id:
                 st.markdown(f"🎤 Voice ready")
         
         with col2:
@@ -221,7 +370,7 @@ with tab3:
             if script_mode == "✍️ Write my own script":
                 script_text = st.text_area(
                     "Your Script",
-                    placeholder=f"Write what {char.get('name', char_id)} should say...\n\nExample: Hey everyone! Today I want to talk about...",
+                    placeholder=f"Write what {char.display_name} should say...\n\nExample: Hey everyone! Today I want to talk about...",
                     height=200
                 )
             else:
@@ -259,6 +408,8 @@ with tab3:
             generate_full = st.button("🎬 Generate Full Video", use_container_width=True, type="primary")
         
         if generate_audio or generate_full:
+            api_keys = {service: get_api_key(service) for service in ("anthropic", "hume", "ltx")}
+            
             # Create output directory
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             output_dir = OUTPUTS_DIR / f"quick_{char_id}_{timestamp}"
@@ -267,54 +418,36 @@ with tab3:
             # Step 1: Generate script if needed
             if script_mode == "🤖 Generate from topic" and topic:
                 with st.spinner("✍️ Writing script..."):
-                    api_key = get_api_key("anthropic")
+                    api_key = api_keys["anthropic"]
                     if not api_key:
                         st.error("❌ Anthropic API key not configured!")
                         st.info("Add it in Streamlit Cloud Settings → Secrets")
                         st.stop()
                     
                     # Build prompt based on character
-                    prompt = f"""Write a short video script for {char.get('name', char_id)}.
+                    prompt = _SCRIPT_TEMPLATE.format_map({
+                        "name": char.display_name,
+                        "role": char.role or "Content creator",
+                        "description": char.description or "Engaging personality",
+                        "topic": topic,
+                        "tone": tone,
+                        "duration": duration,
+                    })
 
-**Character:** {char.get('name', char_id)}
-**Role:** {char.get('role', 'Content creator')}
-**Description:** {char.get('description', 'Engaging personality')}
-
-**Topic:** {topic}
-**Tone:** {tone}
-**Target Duration:** {duration}
-
-Write the script as direct dialogue - what the character says to camera. 
-No stage directions, just the spoken words.
-Make it sound natural, conversational, and true to the character.
-Include personality, catchphrases, and authentic voice.
-
-Script:"""
-
-                    response = requests.post(
-                        "https://api.anthropic.com/v1/messages",
-                        headers={
-                            "x-api-key": api_key,
-                            "content-type": "application/json",
-                            "anthropic-version": "2023-06-01"
-                        },
-                        json={
-                            "model": "claude-3-5-sonnet-20241022",
-                            "max_tokens": 2048,
-                            "messages": [{"role": "user", "content": prompt}]
-                        },
-                        timeout=60
-                    )
+                    response = anthropic_messages(api_key, {
+                        "model": "claude-3-5-sonnet-20241022",
+                        "max_tokens": 2048,
+                        "messages": [{"role": "user", "content": prompt}]
+                    }, timeout=60)
                     
                     if response.status_code == 200:
-                        script_text = response.json()["content"][0]["text"]
+                        script_text = loads(response.content)["content"][0]["text"]
                         st.success("✅ Script generated!")
                         with st.expander("View Script"):
                             st.markdown(script_text)
                         
                         # Save script
-                        with open(output_dir / "script.txt", "w") as f:
-                            f.write(script_text)
+                        write_text_atomic(output_dir / "script.txt", script_text)
                     else:
                         st.error(f"Script generation failed: {response.status_code}")
                         st.stop()
@@ -323,55 +456,96 @@ Script:"""
                 st.error("Please provide a script or topic!")
                 st.stop()
             
-            # Step 2: Generate audio with Hume
-            with st.spinner("🎤 Generating voice..."):
-                hume_key = get_api_key("hume")
-                voice_id = char.get('voice_id')
-                
-                if not hume_key:
-                    st.error("❌ Hume API key not configured!")
-                    st.info("Add it in Streamlit Cloud Settings → Secrets")
-                    st.stop()
-                
-                if not voice_id:
-                    st.error(f"❌ No voice ID set for {char.get('name', char_id)}")
-                    st.info("Edit the character to add a Hume voice ID")
-                    st.stop()
+            # Step 2: Generate audio with Hume (and video with LTX, concurrently)
+            hume_key = api_keys["hume"]
+            ltx_key = api_keys["ltx"]
+            voice_id = char.voice_id
+            
+            if not hume_key:
+                st.error("❌ Hume API key not configured!")
+                st.info("Add it in Streamlit Cloud Settings → Secrets")
+                st.stop()
+            
+            if not voice_id:
+                st.error(f"❌ No voice ID set for {char.display_name}")
+                st.info("Edit the character to add a Hume voice ID")
+                st.stop()
+            
+            audio_path = output_dir / "audio.mp3"
+            video_path = output_dir / "video.mp4"
+            session = http_session()
+            
+            # Audio and video only depend on the script/character, so both requests
+            # run at once and each worker streams its file to disk as it arrives
+            executor = ThreadPoolExecutor(max_workers=2)
+            tts_future = executor.submit(
+                post_to_file, session,
+                "https://api.hume.ai/v0/tts",
+                audio_path,
+                headers={
+                    "X-Hume-Api-Key": hume_key,
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "text": script_text,
+                    "voice": {"id": voice_id}
+                },
+                timeout=120
+            )
+            
+            video_future = None
+            if generate_full and ltx_key:
+                # Determine aspect ratio
+                if "9:16" in output_format:
+                    resolution = "1080x1920"  # Portrait
+                else:
+                    resolution = "1920x1080"  # Landscape
                 
-                # Call Hume TTS API
-                tts_response = requests.post(
-                    "https://api.hume.ai/v0/tts",
+                # Create video prompt based on character
+                video_prompt = f"""A {char.role or 'content creator'} speaking to camera. 
+{char.description or 'Professional, engaging presence'}. 
+High quality, well-lit, modern setting. Social media video style."""
+
+                # Call LTX Video API
+                video_future = executor.submit(
+                    post_to_file, session,
+                    "https://api.ltx.video/v1/text-to-video",
+                    video_path,
                     headers={
-                        "X-Hume-Api-Key": hume_key,
+                        "Authorization": f"Bearer {ltx_key}",
                         "Content-Type": "application/json"
                     },
                     json={
-                        "text": script_text,
-                        "voice": {"id": voice_id}
+                        "prompt": video_prompt,
+                        "model": "ltx-2-fast",
+                        "duration": 6,
+                        "resolution": resolution,
+                        "generate_audio": False
                     },
-                    timeout=120
+                    timeout=300
                 )
+            executor.shutdown(wait=False)
+            
+            with st.spinner("🎤 Generating voice..."):
+                tts_response = tts_future.result()
                 
                 if tts_response.status_code == 200:
-                    audio_path = output_dir / "audio.mp3"
-                    with open(audio_path, "wb") as f:
-                        f.write(tts_response.content)
-                    
                     st.success("✅ Audio generated!")
-                    st.audio(str(audio_path))
+                    # Read once; the player and the download share the bytes
+                    audio_bytes = audio_path.read_bytes()
+                    st.audio(audio_bytes, format="audio/mpeg")
                     
                     # Download button for audio
-                    with open(audio_path, "rb") as f:
-                        st.download_button(
-                            "📥 Download Audio",
-                            f,
-                            file_name=f"{char_id}_{timestamp}.mp3",
-                            mime="audio/mpeg"
-                        )
+                    st.download_button(
+                        "📥 Download Audio",
+                        audio_bytes,
+                        file_name=f"{char_id}_{timestamp}.mp3",
+                        mime="audio/mpeg"
+                    )
                 else:
                     st.error(f"Audio generation failed: {tts_response.status_code}")
                     try:
-                        st.json(tts_response.json())
+                        st.json(loads(tts_response.content))
                     except:
                         st.text(tts_response.text[:500])
                     st.stop()
@@ -379,55 +553,23 @@ Script:"""
             # Step 3: Generate video if requested
             if generate_full:
                 with st.spinner("🎬 Generating video... (this may take a few minutes)"):
-                    ltx_key = get_api_key("ltx")
-                    
-                    if not ltx_key:
+                    if not video_future:
                         st.warning("⚠️ LTX API key not configured - video generation skipped")
                         st.info("Add it in Streamlit Cloud Settings → Secrets for full video generation")
                     else:
-                        # Determine aspect ratio
-                        if "9:16" in output_format:
-                            resolution = "1080x1920"  # Portrait
-                        else:
-                            resolution = "1920x1080"  # Landscape
-                        
-                        # Create video prompt based on character
-                        video_prompt = f"""A {char.get('role', 'content creator')} speaking to camera. 
-{char.get('description', 'Professional, engaging presence')}. 
-High quality, well-lit, modern setting. Social media video style."""
-
-                        # Call LTX Video API
-                        video_response = requests.post(
-                            "https://api.ltx.video/v1/text-to-video",
-                            headers={
-                                "Authorization": f"Bearer {ltx_key}",
-                                "Content-Type": "application/json"
-                            },
-                            json={
-                                "prompt": video_prompt,
-                                "model": "ltx-2-fast",
-                                "duration": 6,
-                                "resolution": resolution,
-                                "generate_audio": False
-                            },
-                            timeout=300
-                        )
+                        video_response = video_future.result()
                         
                         if video_response.status_code == 200:
-                            video_path = output_dir / "video.mp4"
-                            with open(video_path, "wb") as f:
-                                f.write(video_response.content)
-                            
                             st.success("✅ Video generated!")
-                            st.video(str(video_path))
+                            video_bytes = video_path.read_bytes()
+                            st.video(video_bytes, format="video/mp4")
                             
-                            with open(video_path, "rb") as f:
-                                st.download_button(
-                                    "📥 Download Video",
-                                    f,
-                                    file_name=f"{char_id}_{timestamp}.mp4",
-                                    mime="video/mp4"
-                                )
+                            st.download_button(
+                                "📥 Download Video",
+                                video_bytes,
+                                file_name=f"{char_id}_{timestamp}.mp4",
+                                mime="video/mp4"
+                            )
                             
                             st.info("💡 **Tip:** Combine the audio and video in CapCut or your favorite editor for the final result!")
                         else:
@@ -442,57 +584,62 @@ High quality, well-lit, modern setting. Social media video style."""
 # Edit modal
 if "editing_char" in st.session_state:
     char_id = st.session_state.editing_char
-    char = st.session_state.characters.get(char_id, {})
+    char = characters.get(char_id) or Character(char_id)
     
     st.divider()
-    st.markdown(f"### ✏️ Editing: {char.get('name', char_id)}")
+    st.markdown(f"### ✏️ Editing: {char.display_name}")
     
     with st.form("edit_character"):
         col1, col2 = st.columns([1, 2])
         
         with col1:
-            img_path = CHARACTERS_DIR / f"{char_id}.png"
-            if img_path.exists():
-                st.image(str(img_path), width=200)
+            img_path = thumb_path(char_id)
             uploaded_file = st.file_uploader("New Image", type=['png', 'jpg', 'jpeg', 'webp'], key="edit_img")
+            if uploaded_file:
+                show_img(upload_data_uri(uploaded_file), 200)
+            elif img_path.exists():
+                thumb = thumb_data_uri(str(img_path), img_path.stat().st_mtime_ns, 200)
+                if thumb:
+                    show_img(thumb, 200)
+                else:
+                    st.markdown("🎭")
         
         with col2:
-            char_name = st.text_input("Display Name", value=char.get('name', ''))
-            char_role = st.text_input("Role", value=char.get('role', ''))
-            char_desc = st.text_area("Description", value=char.get('description', ''), height=100)
+            char_name = st.text_input("Display Name", value=char.name)
+            char_role = st.text_input("Role", value=char.role)
+            char_desc = st.text_area("Description", value=char.description, height=100)
         
         col1, col2 = st.columns(2)
         with col1:
             voice_provider = st.selectbox("Voice Provider", ["hume", "elevenlabs", "none"], 
-                index=["hume", "elevenlabs", "none"].index(char.get('voice_provider', 'none')))
+                index=["hume", "elevenlabs", "none"].index(char.voice_provider))
         with col2:
-            voice_id = st.text_input("Voice ID", value=char.get('voice_id', ''))
+            voice_id = st.text_input("Voice ID", value=char.voice_id)
         
         col1, col2 = st.columns(2)
         with col1:
             if st.form_submit_button("💾 Save Changes", use_container_width=True):
-                st.session_state.characters[char_id] = {
+                upsert_character(char_id, {
                     "name": char_name,
                     "role": char_role,
                     "description": char_desc,
                     "voice_provider": voice_provider,
                     "voice_id": voice_id
-                }
-                save_json(DATA_DIR / "characters.json", st.session_state.characters)
-                
-                if uploaded_file:
-                    with open(CHARACTERS_DIR / f"{char_id}.png", "wb") as f:
-                        f.write(uploaded_file.getvalue())
+                })
                 
                 del st.session_state.editing_char
                 st.success("✅ Saved!")
-                st.rerun()
+                
+                if not uploaded_file or store_image(uploaded_file, char_id):
+                    _mark_rerun()
         
         with col2:
             if st.form_submit_button("❌ Cancel", use_container_width=True):
                 del st.session_state.editing_char
-                st.rerun()
+                _mark_rerun()
 
 # Clear quick video selection on page load if not coming from a button
 if 'quick_video_char' in st.session_state and not st.session_state.get('_from_roster_click'):
     pass  # Keep selection
+
+_flush_rerun()
@@ -5,31 +5,50 @@ Create and manage show concepts with character assignments.
 
 import streamlit as st
 from pathlib import Path
-import json
 from datetime import datetime
+from itertools import islice
 import uuid
+import zipfile
+
+from utils.state import characters_version, delete_show, get_characters, get_shows, update_show
 
 APP_DIR = Path(__file__).parent.parent
 DATA_DIR = APP_DIR / "data"
+SHOWS_PER_PAGE = 10
 
-DATA_DIR.mkdir(exist_ok=True)
+FORMATS = (
+    "Sitcom / Comedy",
+    "Documentary",
+    "News / Commentary",
+    "Interview",
+    "Educational",
+    "Drama",
+    "Custom"
+)
+DURATIONS = (
+    "Short (1-3 min)",
+    "Medium (3-7 min)",
+    "Long (7-15 min)",
+    "Full Episode (15-30 min)"
+)
+TONES = ("Comedic", "Dramatic", "Educational", "Casual", "Energetic", "Mysterious")
+EPISODE_TONES = ("Comedic", "Dramatic", "Educational", "Casual", "Energetic")
 
-def load_json(path, default=None):
-    if path.exists():
-        with open(path) as f:
-            return json.load(f)
-    return default or {}
+DATA_DIR.mkdir(exist_ok=True)
 
-def save_json(path, data):
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+@st.cache_data(show_spinner=False)
+def roster_options(version):
+    """Name lookup and widget options for the roster, rebuilt only when it changes"""
+    characters = get_characters()
+    name_by_id = {cid: c.get('name', cid) for cid, c in characters.items()}
+    cast_options = {f"{v.get('name', k)} ({v.get('role', 'Character')})": k for k, v in characters.items()}
+    narrator_options = ("None",) + tuple(characters)
+    return name_by_id, cast_options, narrator_options
 
 # Load data
-if "characters" not in st.session_state:
-    st.session_state.characters = load_json(DATA_DIR / "characters.json", {})
+char_name_by_id, cast_options, narrator_options = roster_options(characters_version())
 
-if "shows" not in st.session_state:
-    st.session_state.shows = load_json(DATA_DIR / "shows.json", {})
+shows = get_shows()
 
 st.title("💡 Shows")
 st.markdown("Create and manage show concepts.")
@@ -37,29 +56,48 @@ st.markdown("Create and manage show concepts.")
 # Tabs
 tab1, tab2, tab3 = st.tabs(["📺 My Shows", "➕ Create Show", "📋 Templates"])
 
+def _mark_rerun():
+    # Handlers only flag the rerun; it fires once, after all state changes
+    st.session_state._needs_rerun = True
+
 with tab1:
-    if not st.session_state.shows:
+    # Card buttons queue their changes; they are applied together after the loop
+    pending_ops = []
+    if not shows:
         st.info("No shows yet. Create one in the 'Create Show' tab!")
     else:
-        for show_id, show in st.session_state.shows.items():
+        # Only one page of cards is built per run; expanders would still run every body
+        page_count = -(-len(shows) // SHOWS_PER_PAGE)
+        if st.session_state.get("shows_page", 1) > page_count:
+            st.session_state.shows_page = page_count
+        page = 1
+        if page_count > 1:
+            page = st.number_input("Page", min_value=1, max_value=page_count, key="shows_page")
+        start = (page - 1) * SHOWS_PER_PAGE
+        
+        for show_id, show in islice(shows.items(), start, start + SHOWS_PER_PAGE):
             with st.container(border=True):
                 col1, col2, col3 = st.columns([3, 1, 1])
                 
                 with col1:
-                    st.markdown(f"### {show.get('title', 'Untitled')}")
-                    st.caption(f"Format: {show.get('format', 'Unknown')} | Episodes: {len(show.get('episodes', []))}")
-                    st.markdown(show.get('description', '')[:200] + "..." if len(show.get('description', '')) > 200 else show.get('description', ''))
+                    # One markdown element per card instead of one per line
+                    desc = show.get('description', '')
+                    parts = [
+                        f"### {show.get('title', 'Untitled')}",
+                        f":gray[Format: {show.get('format', 'Unknown')} | Episodes: {len(show.get('episodes', []))}]",
+                        desc if len(desc) <= 200 else desc[:200] + "...",
+                    ]
                     
                     # Characters
                     chars = show.get('characters', [])
                     if chars:
-                        char_names = [st.session_state.characters.get(c, {}).get('name', c) for c in chars]
-                        st.markdown(f"**Cast:** {', '.join(char_names)}")
+                        char_names = [char_name_by_id.get(c, c) for c in chars]
+                        parts.append(f"**Cast:** {', '.join(char_names)}")
+                    st.markdown("\n\n".join(parts))
                 
                 with col2:
                     if st.button("✏️ Edit", key=f"edit_show_{show_id}", use_container_width=True):
-                        st.session_state.editing_show = show_id
-                        st.rerun()
+                        pending_ops.append(("edit", show_id))
                     
                     if st.button("🎬 Produce", key=f"produce_{show_id}", use_container_width=True):
                         st.session_state.producing_show = show_id
@@ -67,9 +105,16 @@ with tab1:
                 
                 with col3:
                     if st.button("🗑️ Delete", key=f"del_show_{show_id}", use_container_width=True):
-                        del st.session_state.shows[show_id]
-                        save_json(DATA_DIR / "shows.json", st.session_state.shows)
-                        st.rerun()
+                        pending_ops.append(("delete", show_id))
+    
+    for op, show_id in pending_ops:
+        if op == "edit":
+            st.session_state.editing_show = show_id
+        elif op == "delete":
+            del shows[show_id]
+            delete_show(show_id)
+    if pending_ops:
+        _mark_rerun()
 
 with tab2:
     st.markdown("### Create New Show")
@@ -81,37 +126,22 @@ with tab2:
         
         col1, col2 = st.columns(2)
         with col1:
-            format_type = st.selectbox("Format", [
-                "Sitcom / Comedy",
-                "Documentary",
-                "News / Commentary", 
-                "Interview",
-                "Educational",
-                "Drama",
-                "Custom"
-            ])
+            format_type = st.selectbox("Format", FORMATS)
         with col2:
-            target_duration = st.selectbox("Target Duration", [
-                "Short (1-3 min)",
-                "Medium (3-7 min)",
-                "Long (7-15 min)",
-                "Full Episode (15-30 min)"
-            ])
+            target_duration = st.selectbox("Target Duration", DURATIONS)
         
         st.divider()
         st.markdown("#### 🎭 Cast")
         
-        if not st.session_state.characters:
+        if not char_name_by_id:
             st.warning("No characters available. Add some in the Characters page first!")
             selected_chars = []
         else:
-            char_options = {f"{v.get('name', k)} ({v.get('role', 'Character')})": k 
-                          for k, v in st.session_state.characters.items()}
-            selected_display = st.multiselect("Select Characters", list(char_options.keys()))
-            selected_chars = [char_options[d] for d in selected_display]
+            selected_display = st.multiselect("Select Characters", tuple(cast_options))
+            selected_chars = [cast_options[d] for d in selected_display]
         
         # Narrator
-        narrator = st.selectbox("Narrator", ["None"] + list(st.session_state.characters.keys()))
+        narrator = st.selectbox("Narrator", narrator_options)
         
         st.divider()
         st.markdown("#### 💡 Episode Concept")
@@ -122,7 +152,7 @@ with tab2:
         # Tone and style
         col1, col2 = st.columns(2)
         with col1:
-            tone = st.selectbox("Tone", ["Comedic", "Dramatic", "Educational", "Casual", "Energetic", "Mysterious"])
+            tone = st.selectbox("Tone", TONES)
         with col2:
             style = st.text_input("Visual Style", placeholder="Mid-century modern LA apartment, warm lighting...")
         
@@ -139,7 +169,7 @@ with tab2:
             else:
                 show_id = str(uuid.uuid4())[:8]
                 
-                st.session_state.shows[show_id] = {
+                show = {
                     "title": title,
                     "description": description,
                     "format": format_type,
@@ -156,19 +186,22 @@ with tab2:
                         "status": "draft"
                     }] if episode_topic else []
                 }
-                
-                save_json(DATA_DIR / "shows.json", st.session_state.shows)
+                # Leave out empty fields; every reader falls back via .get()
+                show = {k: v for k, v in show.items() if v}
+                shows[show_id] = show
+                update_show(show_id, show)
                 
                 # Save reference images
                 if ref_images:
                     show_refs = DATA_DIR / "show_refs" / show_id
                     show_refs.mkdir(parents=True, exist_ok=True)
-                    for i, img in enumerate(ref_images):
-                        with open(show_refs / f"ref_{i}.png", "wb") as f:
-                            f.write(img.getvalue())
+                    # One stored (uncompressed) archive instead of a file per image
+                    with zipfile.ZipFile(show_refs / "refs.zip", "w", zipfile.ZIP_STORED) as zf:
+                        for i, img in enumerate(ref_images):
+                            zf.writestr(f"ref_{i}.png", img.getvalue())
                 
                 st.success(f"✅ Created '{title}'!")
-                st.rerun()
+                _mark_rerun()
 
 with tab3:
     st.markdown("### 📋 Show Templates")
@@ -226,7 +259,7 @@ with tab3:
 # Edit show modal
 if "editing_show" in st.session_state:
     show_id = st.session_state.editing_show
-    show = st.session_state.shows.get(show_id, {})
+    show = shows.get(show_id, {})
     
     st.divider()
     st.markdown(f"### ✏️ Editing: {show.get('title', 'Untitled')}")
@@ -236,7 +269,7 @@ if "editing_show" in st.session_state:
     with st.form("add_episode"):
         ep_title = st.text_input("Episode Title")
         ep_topic = st.text_area("Topic / Premise", height=100)
-        ep_tone = st.selectbox("Tone", ["Comedic", "Dramatic", "Educational", "Casual", "Energetic"])
+        ep_tone = st.selectbox("Tone", EPISODE_TONES)
         
         col1, col2 = st.columns(2)
         with col1:
@@ -250,18 +283,19 @@ if "editing_show" in st.session_state:
                         "tone": ep_tone,
                         "status": "draft"
                     })
-                    st.session_state.shows[show_id] = show
-                    save_json(DATA_DIR / "shows.json", st.session_state.shows)
+                    update_show(show_id, show)
                     st.success(f"Added episode: {ep_title}")
-                    st.rerun()
+                    _mark_rerun()
         with col2:
             if st.form_submit_button("❌ Done Editing", use_container_width=True):
                 del st.session_state.editing_show
-                st.rerun()
+                _mark_rerun()
     
     # List episodes
     if show.get("episodes"):
         st.markdown("#### Episodes")
+        # Marked indexes are dropped in one rebuild after the loop
+        ep_deletes = set()
         for i, ep in enumerate(show["episodes"]):
             with st.container(border=True):
                 col1, col2 = st.columns([4, 1])
@@ -270,7 +304,12 @@ if "editing_show" in st.session_state:
                     st.caption(ep.get('topic', '')[:100])
                 with col2:
                     if st.button("🗑️", key=f"del_ep_{i}"):
-                        show["episodes"].pop(i)
-                        st.session_state.shows[show_id] = show
-                        save_json(DATA_DIR / "shows.json", st.session_state.shows)
-                        st.rerun()
+                        ep_deletes.add(i)
+        
+        if ep_deletes:
+            show["episodes"] = [ep for i, ep in enumerate(show["episodes"]) if i not in ep_deletes]
+            update_show(show_id, show)
+            _mark_rerun()
+
+if st.session_state.pop("_needs_rerun", False):
+    st.rerun()
@@ -5,66 +5,91 @@ Generate scripts, audio, and video for your shows.
 
 import streamlit as st
 from pathlib import Path
-import json
 import subprocess
-import os
 import time
 from datetime import datetime
 
+from utils.http import StreamError, anthropic_stream, iter_text_deltas
+from utils.keys import get_api_key
+from utils.serialization import write_text_atomic
+from utils.state import characters_version, get_characters, get_shows, shows_version
+
 APP_DIR = Path(__file__).parent.parent
 DATA_DIR = APP_DIR / "data"
 OUTPUTS_DIR = APP_DIR / "outputs"
 CHARACTERS_DIR = APP_DIR / "characters"
+API_SERVICES = ("anthropic", "hume", "ltx", "openai")
+SCRIPT_MODELS = ("claude-sonnet-4", "gpt-4o", "claude-opus-4")
+VIDEO_METHODS = (
+    "🎬 Full AI Video (LTX - recommended)",
+    "📸 Static Images + Audio",
+    "🎭 Lip-sync Talking Heads (D-ID)"
+)
 
 DATA_DIR.mkdir(exist_ok=True)
 OUTPUTS_DIR.mkdir(exist_ok=True)
 
-def load_json(path, default=None):
-    if path.exists():
-        with open(path) as f:
-            return json.load(f)
-    return default or {}
+@st.cache_data(show_spinner=False)
+def build_prompt(show_id, episode_idx, target_lines, shows_version, chars_version):
+    """Episode script prompt, reused until the show, roster or target length changes"""
+    characters = get_characters()
+    show = get_shows()[show_id]
+    episode = show["episodes"][episode_idx]
+    
+    # Build character descriptions
+    char_descriptions = []
+    for char_id in show.get('characters', []):
+        char = characters.get(char_id, {})
+        char_descriptions.append(f"- **{char.get('name', char_id)}**: {char.get('description', char.get('role', 'Character'))}")
+    
+    narrator_info = ""
+    if show.get('narrator'):
+        narrator = characters.get(show['narrator'], {})
+        narrator_info = f"\n\n**Narrator:** {narrator.get('name', show['narrator'])} - {narrator.get('description', 'Provides commentary')}"
+    
+    return f"""Write a script for an AI-generated video episode.
 
-def save_json(path, data):
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+**Show:** {show.get('title')}
+**Format:** {show.get('format', 'Sitcom')}
+**Episode:** {episode.get('title')}
+**Topic:** {episode.get('topic')}
+**Tone:** {episode.get('tone', 'Comedic')}
+**Visual Style:** {show.get('visual_style', 'Modern, cinematic')}
 
-# Load API keys - check Streamlit secrets first, then local files
-SECRETS_DIR = Path(os.path.expanduser("~/clawd/.secrets"))
+**Characters:**
+{chr(10).join(char_descriptions)}
+{narrator_info}
 
-def get_api_key(service):
-    # First try Streamlit secrets (for cloud deployment)
-    try:
-        if "api_keys" in st.secrets and service in st.secrets["api_keys"]:
-            return st.secrets["api_keys"][service]
-    except Exception:
-        pass
-    
-    # Fall back to local files (for local development)
-    key_file = SECRETS_DIR / f"{service}.json"
-    if key_file.exists():
-        with open(key_file) as f:
-            data = json.load(f)
-            return data.get("api_key") or data.get("key")
-    return None
+**Requirements:**
+1. Write approximately {target_lines} dialogue lines
+2. Mark each line with the character name in CAPS
+3. Include [SCENE] markers for visual changes
+4. Include V.O. (voiceover) lines for narrator sections
+5. Add stage directions in (parentheses)
+6. Make it engaging, funny, and suitable for social media clips
+
+**Format Example:**
+[SCENE: Morning in the apartment, sunlight streaming through windows]
+
+ROXIE (V.O.): It started like any other morning at the AI House...
+
+CLAIRE: (entering with coffee) Good morning everyone!
+
+VV: (scrolling phone) Did you see what trending on Instagram?
+
+Write the full script:"""
 
 # Load data
-if "characters" not in st.session_state:
-    st.session_state.characters = load_json(DATA_DIR / "characters.json", {})
+characters = get_characters()
+char_name_by_id = {cid: c.get('name', cid) for cid, c in characters.items()}
 
-if "shows" not in st.session_state:
-    st.session_state.shows = load_json(DATA_DIR / "shows.json", {})
+shows = get_shows()
 
 st.title("🎥 Production")
 st.markdown("Generate scripts, audio, and video for your shows.")
 
 # Check API keys
-api_status = {
-    "anthropic": "✅" if get_api_key("anthropic") else "❌",
-    "hume": "✅" if get_api_key("hume") else "❌",
-    "ltx": "✅" if get_api_key("ltx") else "❌",
-    "openai": "✅" if get_api_key("openai") else "❌",
-}
+api_status = {service: "✅" if get_api_key(service) else "❌" for service in API_SERVICES}
 
 with st.expander("🔑 API Status"):
     cols = st.columns(4)
@@ -74,7 +99,7 @@ with st.expander("🔑 API Status"):
 # Select show and episode
 st.divider()
 
-if not st.session_state.shows:
+if not shows:
     st.warning("No shows created yet. Create one first!")
     if st.button("➕ Create Show"):
         st.switch_page("pages/2_💡_Shows.py")
@@ -82,17 +107,20 @@ else:
     col1, col2 = st.columns(2)
     
     with col1:
-        show_options = {f"{s.get('title', 'Untitled')}": sid for sid, s in st.session_state.shows.items()}
-        selected_show_name = st.selectbox("Select Show", list(show_options.keys()))
-        selected_show_id = show_options[selected_show_name]
-        show = st.session_state.shows[selected_show_id]
+        # Options are the ids themselves; labels are only computed for display
+        selected_show_id = st.selectbox(
+            "Select Show", shows,
+            format_func=lambda sid: shows[sid].get('title', 'Untitled')
+        )
+        show = shows[selected_show_id]
     
     with col2:
         episodes = show.get("episodes", [])
         if episodes:
-            ep_options = {f"{i+1}. {ep.get('title', 'Untitled')}": i for i, ep in enumerate(episodes)}
-            selected_ep_name = st.selectbox("Select Episode", list(ep_options.keys()))
-            selected_ep_idx = ep_options[selected_ep_name]
+            selected_ep_idx = st.selectbox(
+                "Select Episode", range(len(episodes)),
+                format_func=lambda i: f"{i+1}. {episodes[i].get('title', 'Untitled')}"
+            )
             episode = episodes[selected_ep_idx]
         else:
             st.warning("No episodes in this show.")
@@ -106,16 +134,22 @@ else:
             st.markdown(f"### {show.get('title')}: {episode.get('title')}")
             st.markdown(f"**Topic:** {episode.get('topic', 'Not specified')}")
             st.markdown(f"**Tone:** {episode.get('tone', 'Not specified')}")
-            st.markdown(f"**Cast:** {', '.join([st.session_state.characters.get(c, {}).get('name', c) for c in show.get('characters', [])])}")
+            st.markdown(f"**Cast:** {', '.join([char_name_by_id.get(c, c) for c in show.get('characters', [])])}")
             if show.get('narrator'):
-                st.markdown(f"**Narrator:** {st.session_state.characters.get(show['narrator'], {}).get('name', show['narrator'])}")
+                st.markdown(f"**Narrator:** {char_name_by_id.get(show['narrator'], show['narrator'])}")
         
         # Production pipeline
         st.divider()
         st.markdown("## 🚀 Production Pipeline")
         
         # Create output directory for this production
-        production_id = f"{selected_show_id}_{selected_ep_idx}_{datetime.now().strftime('%Y%m%d_%H%M')}"
+        # Pinned per (show, episode) for the session, so a minute rollover
+        # doesn't point the page at a fresh, empty directory
+        prod_ids = st.session_state.setdefault("_prod_ids", {})
+        prod_key = (selected_show_id, selected_ep_idx)
+        if prod_key not in prod_ids:
+            prod_ids[prod_key] = f"{selected_show_id}_{selected_ep_idx}_{datetime.now().strftime('%Y%m%d_%H%M')}"
+        production_id = prod_ids[prod_key]
         production_dir = OUTPUTS_DIR / production_id
         
         # Step 1: Script Generation
@@ -123,97 +157,50 @@ else:
         
         col1, col2 = st.columns([3, 1])
         with col1:
-            script_model = st.selectbox("AI Model", ["claude-sonnet-4", "gpt-4o", "claude-opus-4"])
+            script_model = st.selectbox("AI Model", SCRIPT_MODELS)
             target_lines = st.slider("Target Dialogue Lines", 20, 100, 50)
         
         script_path = production_dir / "script.md"
         
         if script_path.exists():
-            with open(script_path) as f:
-                existing_script = f.read()
             st.success("✅ Script exists!")
-            with st.expander("View Script"):
-                st.markdown(existing_script)
+            # A collapsed expander still runs its body, so a toggle gates the read
+            if st.toggle("View Script"):
+                st.markdown(script_path.read_text())
         else:
             if st.button("📝 Generate Script", use_container_width=True):
                 production_dir.mkdir(parents=True, exist_ok=True)
                 
                 with st.spinner("Generating script..."):
-                    # Build character descriptions
-                    char_descriptions = []
-                    for char_id in show.get('characters', []):
-                        char = st.session_state.characters.get(char_id, {})
-                        char_descriptions.append(f"- **{char.get('name', char_id)}**: {char.get('description', char.get('role', 'Character'))}")
-                    
-                    narrator_info = ""
-                    if show.get('narrator'):
-                        narrator = st.session_state.characters.get(show['narrator'], {})
-                        narrator_info = f"\n\n**Narrator:** {narrator.get('name', show['narrator'])} - {narrator.get('description', 'Provides commentary')}"
-                    
-                    prompt = f"""Write a script for an AI-generated video episode.
-
-**Show:** {show.get('title')}
-**Format:** {show.get('format', 'Sitcom')}
-**Episode:** {episode.get('title')}
-**Topic:** {episode.get('topic')}
-**Tone:** {episode.get('tone', 'Comedic')}
-**Visual Style:** {show.get('visual_style', 'Modern, cinematic')}
-
-**Characters:**
-{chr(10).join(char_descriptions)}
-{narrator_info}
-
-**Requirements:**
-1. Write approximately {target_lines} dialogue lines
-2. Mark each line with the character name in CAPS
-3. Include [SCENE] markers for visual changes
-4. Include V.O. (voiceover) lines for narrator sections
-5. Add stage directions in (parentheses)
-6. Make it engaging, funny, and suitable for social media clips
-
-**Format Example:**
-[SCENE: Morning in the apartment, sunlight streaming through windows]
-
-ROXIE (V.O.): It started like any other morning at the AI House...
-
-CLAIRE: (entering with coffee) Good morning everyone!
-
-VV: (scrolling phone) Did you see what trending on Instagram?
-
-Write the full script:"""
+                    prompt = build_prompt(
+                        selected_show_id, selected_ep_idx, target_lines,
+                        shows_version(), characters_version()
+                    )
 
                     # Use Anthropic API
-                    import requests
-                    
                     api_key = get_api_key("anthropic")
                     if not api_key:
                         st.error("Anthropic API key not found!")
                     else:
-                        response = requests.post(
-                            "https://api.anthropic.com/v1/messages",
-                            headers={
-                                "x-api-key": api_key,
-                                "content-type": "application/json",
-                                "anthropic-version": "2023-06-01"
-                            },
-                            json={
-                                "model": "claude-sonnet-4-20250514",
-                                "max_tokens": 8192,
-                                "messages": [{"role": "user", "content": prompt}]
-                            },
-                            timeout=120
-                        )
+                        response = anthropic_stream(api_key, {
+                            "model": "claude-sonnet-4-20250514",
+                            "max_tokens": 8192,
+                            "messages": [{"role": "user", "content": prompt}]
+                        })
                         
                         if response.status_code == 200:
-                            script = response.json()["content"][0]["text"]
-                            
-                            with open(script_path, "w") as f:
-                                f.write(script)
-                            
-                            st.success("✅ Script generated!")
-                            with st.expander("View Script"):
-                                st.markdown(script)
-                            st.rerun()
+                            # Render tokens as they arrive instead of waiting for the whole script
+                            try:
+                                with st.expander("View Script", expanded=True):
+                                    script = st.write_stream(iter_text_deltas(response))
+                            except StreamError as e:
+                                # Only a completed stream is saved, so the partial text can be regenerated
+                                st.error(f"Script generation stopped early ({e}). Nothing was saved - try again.")
+                            else:
+                                write_text_atomic(script_path, script)
+                                
+                                st.success("✅ Script generated!")
+                                st.rerun()
                         else:
                             st.error(f"API Error: {response.status_code} - {response.text[:200]}")
         
@@ -247,11 +234,7 @@ Write the full script:"""
             st.success("✅ Video exists!")
             st.video(str(video_path))
         elif combined_audio.exists():
-            video_method = st.radio("Video Method", [
-                "🎬 Full AI Video (LTX - recommended)",
-                "📸 Static Images + Audio",
-                "🎭 Lip-sync Talking Heads (D-ID)"
-            ])
+            video_method = st.radio("Video Method", VIDEO_METHODS)
             
             if st.button("🎥 Generate Video", use_container_width=True):
                 with st.spinner("Generating video... This may take 10-20 minutes."):
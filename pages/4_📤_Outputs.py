@@ -5,21 +5,89 @@ View, download, and publish your productions.
 
 import streamlit as st
 from pathlib import Path
-import json
 import os
 from datetime import datetime
 
+from utils.keys import SECRETS_DIR
+
 APP_DIR = Path(__file__).parent.parent
-DATA_DIR = APP_DIR / "data"
 OUTPUTS_DIR = APP_DIR / "outputs"
 
 OUTPUTS_DIR.mkdir(exist_ok=True)
 
+def has_secret(service):
+    return (SECRETS_DIR / f"{service}.json").exists()
+
+
+def collect_outputs(root):
+    """
+    One os.walk over outputs/, pruned below production/<subfolder>.
+    Returns {production: {"mtime": ..., "files": {subfolder or "": {file names}}}}.
+    """
+    listing = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        parts = Path(dirpath).relative_to(root).parts
+        if not parts:
+            continue
+        if len(parts) == 1:
+            listing[parts[0]] = {"mtime": os.stat(dirpath).st_mtime, "files": {"": set(filenames)}}
+        else:
+            dirnames[:] = []  # nothing below production/<subfolder> is needed
+            listing[parts[0]]["files"][parts[1]] = set(filenames)
+    return listing
+
+
+def summarize(files):
+    """What a production contains, from its collected file names."""
+    audio_names = files.get("audio", set())
+    return {
+        "script": "script.md" in files[""],
+        "audio_combined": "combined.mp3" in audio_names,
+        "video_final": "final.mp4" in files.get("video", set()),
+        "clip_count": sum(1 for n in files.get("clips", ()) if n.endswith(".mp4")),
+        "audio_count": sum(1 for n in audio_names if n.endswith(".mp3")),
+    }
+
+
+def caption(summary, mtime):
+    """The card's contents line and timestamp, built once per scan."""
+    file_types = []
+    if summary["script"]:
+        file_types.append("📝 Script")
+    if summary["audio_combined"]:
+        file_types.append("🎤 Audio")
+    if summary["video_final"]:
+        file_types.append("🎥 Video")
+    if summary["clip_count"]:
+        file_types.append(f"📱 {summary['clip_count']} Clips")
+    return {
+        "caption": " | ".join(file_types) if file_types else "Empty",
+        "modified": f"Modified: {datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M')}",
+    }
+
+
+@st.cache_data(ttl=5, show_spinner=False)
+def scan_productions(outputs_mtime_ns):
+    """Summarize every production folder; keyed on the outputs folder mtime."""
+    records = []
+    for name, info in collect_outputs(OUTPUTS_DIR).items():
+        summary = summarize(info["files"])
+        records.append({
+            "name": name,
+            "path": str(OUTPUTS_DIR / name),
+            "mtime": info["mtime"],
+            **summary,
+            **caption(summary, info["mtime"]),
+        })
+    return records
+
 st.title("📤 Outputs")
 st.markdown("View, download, and publish your productions.")
 
 # List all productions
-productions = sorted(OUTPUTS_DIR.glob("*/"), key=lambda x: x.stat().st_mtime, reverse=True)
+productions = sorted(
+    scan_productions(os.stat(OUTPUTS_DIR).st_mtime_ns), key=lambda p: p["mtime"], reverse=True
+)
 
 if not productions:
     st.info("No productions yet. Go to Production to create one!")
@@ -33,114 +101,106 @@ else:
     with col2:
         sort_by = st.selectbox("Sort by", ["Newest", "Oldest", "Name"])
     
+    listing = productions
     if sort_by == "Oldest":
-        productions = reversed(productions)
+        listing = reversed(productions)
     elif sort_by == "Name":
-        productions = sorted(productions, key=lambda x: x.name)
+        listing = sorted(productions, key=lambda p: p["name"])
     
     st.divider()
     
-    for prod_dir in productions:
-        if search and search.lower() not in prod_dir.name.lower():
+    for prod in listing:
+        name = prod["name"]
+        if search and search.lower() not in name.lower():
             continue
         
         with st.container(border=True):
             col1, col2 = st.columns([3, 1])
             
             with col1:
-                st.markdown(f"### 🎬 {prod_dir.name}")
-                
-                # Check what files exist
-                files = list(prod_dir.rglob("*"))
-                file_types = []
+                st.markdown(f"### 🎬 {name}")
                 
+                prod_dir = Path(prod["path"])
                 script_path = prod_dir / "script.md"
                 audio_path = prod_dir / "audio" / "combined.mp3"
                 video_path = prod_dir / "video" / "final.mp4"
-                
-                if script_path.exists():
-                    file_types.append("📝 Script")
-                if audio_path.exists():
-                    file_types.append("🎤 Audio")
-                if video_path.exists():
-                    file_types.append("🎥 Video")
-                
                 clips_dir = prod_dir / "clips"
-                if clips_dir.exists():
-                    num_clips = len(list(clips_dir.glob("*.mp4")))
-                    if num_clips:
-                        file_types.append(f"📱 {num_clips} Clips")
+                has_audio = prod["audio_combined"]
+                has_video = prod["video_final"]
                 
-                st.caption(" | ".join(file_types) if file_types else "Empty")
-                
-                # Timestamp
-                mtime = datetime.fromtimestamp(prod_dir.stat().st_mtime)
-                st.caption(f"Modified: {mtime.strftime('%Y-%m-%d %H:%M')}")
+                st.caption(prod["caption"])
+                st.caption(prod["modified"])
             
             with col2:
-                # Actions
-                if video_path.exists():
+                # Actions - media is only read once the user asks for a download
+                dl_key = f"dl_{name}"
+                if (has_video or has_audio) and not st.session_state.get(dl_key):
+                    if st.button("📦 Prepare Download", key=f"prep_{name}", use_container_width=True):
+                        st.session_state[dl_key] = True
+                        st.rerun()
+                
+                if has_video and st.session_state.get(dl_key):
                     with open(video_path, "rb") as f:
                         st.download_button(
                             "⬇️ Video",
-                            f.read(),
-                            file_name=f"{prod_dir.name}.mp4",
+                            f,
+                            file_name=f"{name}.mp4",
                             mime="video/mp4",
                             use_container_width=True
                         )
                 
-                if audio_path.exists():
+                if has_audio and st.session_state.get(dl_key):
                     with open(audio_path, "rb") as f:
                         st.download_button(
                             "⬇️ Audio",
-                            f.read(),
-                            file_name=f"{prod_dir.name}.mp3",
+                            f,
+                            file_name=f"{name}.mp3",
                             mime="audio/mpeg",
                             use_container_width=True
                         )
                 
-                if st.button("🗑️ Delete", key=f"del_{prod_dir.name}", use_container_width=True):
+                if st.button("🗑️ Delete", key=f"del_{name}", use_container_width=True):
                     import shutil
                     shutil.rmtree(prod_dir)
+                    scan_productions.clear()
                     st.rerun()
             
-            # Expandable details
-            with st.expander("View Details"):
+            # Details - a collapsed expander would still hand every file to
+            # st.audio/st.video (which load it into memory), so a toggle gates them
+            if st.toggle("View Details", key=f"details_{name}"):
                 tabs = st.tabs(["Script", "Audio", "Video", "Clips"])
                 
                 with tabs[0]:
-                    if script_path.exists():
+                    if prod["script"]:
                         with open(script_path) as f:
                             st.markdown(f.read())
                     else:
                         st.info("No script generated")
                 
                 with tabs[1]:
-                    if audio_path.exists():
+                    if has_audio:
                         st.audio(str(audio_path))
                         
-                        # List individual audio files
-                        audio_files = list((prod_dir / "audio").glob("*.mp3"))
-                        if len(audio_files) > 1:
-                            st.caption(f"{len(audio_files)} audio files")
+                        # Count individual audio files
+                        if prod["audio_count"] > 1:
+                            st.caption(f"{prod['audio_count']} audio files")
                     else:
                         st.info("No audio generated")
                 
                 with tabs[2]:
-                    if video_path.exists():
+                    if has_video:
                         st.video(str(video_path))
                     else:
                         st.info("No video generated")
                 
                 with tabs[3]:
-                    if clips_dir.exists():
-                        clips = list(clips_dir.glob("*.mp4"))
-                        if clips:
-                            for clip in clips:
-                                st.markdown(f"**{clip.name}**")
-                                st.video(str(clip))
-                        else:
-                            st.info("No clips generated")
+                    if prod["clip_count"]:
+                        # Listed only here, once the details are open; the card uses the cached count
+                        with os.scandir(clips_dir) as it:
+                            clips = sorted(e.name for e in it if e.name.endswith(".mp4") and e.is_file())
+                        for clip in clips:
+                            st.markdown(f"**{clip}**")
+                            st.video(str(clips_dir / clip))
                     else:
                         st.info("No clips generated")
 
@@ -156,8 +216,7 @@ with col1:
         st.caption("Publish podcast audio")
         
         # Check Spreaker credentials
-        spreaker_key = Path(os.path.expanduser("~/clawd/.secrets/spreaker.json"))
-        if spreaker_key.exists():
+        if has_secret("spreaker"):
             st.success("✅ Connected")
             if st.button("Publish to Spreaker", use_container_width=True):
                 st.info("Spreaker publishing would happen here")
@@ -170,8 +229,7 @@ with col2:
         st.markdown("### 📺 YouTube")
         st.caption("Upload full videos")
         
-        youtube_key = Path(os.path.expanduser("~/clawd/.secrets/youtube.json"))
-        if youtube_key.exists():
+        if has_secret("youtube"):
             st.success("✅ Connected")
             if st.button("Upload to YouTube", use_container_width=True):
                 st.info("YouTube upload would happen here")
@@ -192,10 +250,10 @@ st.divider()
 st.markdown("## ✂️ Clip Generator")
 st.markdown("Create short clips from your videos for TikTok and Instagram.")
 
-video_productions = [p for p in OUTPUTS_DIR.glob("*/video/final.mp4")]
+video_productions = [p["name"] for p in productions if p["video_final"]]
 
 if video_productions:
-    selected_video = st.selectbox("Select Video", [str(v.parent.parent.name) for v in video_productions])
+    selected_video = st.selectbox("Select Video", video_productions)
     
     col1, col2, col3 = st.columns(3)
     with col1:
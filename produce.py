@@ -5,19 +5,29 @@ Run the full production pipeline from command line.
 
 Usage:
     python produce.py --show <show_id> --episode <episode_idx>
+    python produce.py --show <show_id> --episodes 0,1,2
     python produce.py --config production.json
 """
 
 import os
+import re
 import sys
-import json
+import base64
 import argparse
+import functools
+import hashlib
 import subprocess
+import threading
 import requests
 import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 
+from utils.serialization import dumps, journal_path, load_journaled, loads, save_json, write_bytes_atomic
+
 # Paths
 APP_DIR = Path(__file__).parent
 DATA_DIR = APP_DIR / "data"
@@ -25,23 +35,85 @@ OUTPUTS_DIR = APP_DIR / "outputs"
 CHARACTERS_DIR = APP_DIR / "characters"
 SECRETS_DIR = Path(os.path.expanduser("~/clawd/.secrets"))
 
+# Stage directions like "(smiling)" inside dialogue
+_STAGE_DIR_RE = re.compile(r'\([^)]*\)\s*')
+
+# Bump when the audio manifest layout changes
+MANIFEST_VERSION = 1
+
+# Audio stitching: seconds of silence between lines, and the most inputs
+# handed to a single ffmpeg filter graph before batching kicks in
+AUDIO_GAP = 0.3
+MAX_FILTER_INPUTS = 100
+
+# Hume TTS concurrency
+HUME_WORKERS = 8
+HUME_REQUESTS_PER_SEC = 5
+
+# One pooled session for Claude + Hume so TLS connections are reused.
+# POST is retried on throttling/5xx and connect failures, where the request was
+# rejected or never sent. Read errors are not retried: the server may already be
+# generating (and billing) the script or audio, so re-sending would duplicate it.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=3,
+        read=0,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=None,
+        raise_on_status=False
+    )
+))
+
+# Parsed files are memoized per mtime, so a batch run that builds many
+# ShowRunners only decodes unchanged data once. Results are shared: don't mutate.
+@functools.lru_cache(maxsize=32)
+def _load_json_cached(path_str, mtime_ns):
+    return loads(Path(path_str).read_bytes())
+
 def load_json(path, default=None):
-    if path.exists():
-        with open(path) as f:
-            return json.load(f)
-    return default or {}
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return default or {}
+    return _load_json_cached(str(path), mtime_ns)
+
+def _mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+@functools.lru_cache(maxsize=32)
+def _load_journaled_cached(path_str, mtime_ns, log_mtime_ns):
+    return load_journaled(Path(path_str))
 
-def save_json(path, data):
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+def load_data(path):
+    """Snapshot + journal, keyed on both mtimes like utils.io on the Streamlit side."""
+    return _load_journaled_cached(str(path), _mtime_ns(path), _mtime_ns(journal_path(path)))
 
 def get_api_key(service):
-    key_file = SECRETS_DIR / f"{service}.json"
-    if key_file.exists():
-        with open(key_file) as f:
-            data = json.load(f)
-            return data.get("api_key") or data.get("key")
-    return None
+    # load_json is mtime-memoized, so repeat lookups don't reopen the key file
+    data = load_json(SECRETS_DIR / f"{service}.json")
+    return data.get("api_key") or data.get("key")
+
+class RateLimiter:
+    """Spaces out calls so at most `rps` start per second across threads."""
+    def __init__(self, rps):
+        self.interval = 1.0 / rps
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+    
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if wait > 0:
+            time.sleep(wait)
 
 class ShowRunner:
     def __init__(self, show_id, episode_idx):
@@ -49,8 +121,17 @@ class ShowRunner:
         self.episode_idx = episode_idx
         
         # Load data
-        self.characters = load_json(DATA_DIR / "characters.json", {})
-        self.shows = load_json(DATA_DIR / "shows.json", {})
+        self.characters = load_data(DATA_DIR / "characters.json")
+        self.shows = load_data(DATA_DIR / "shows.json")
+        
+        # Uppercased IDs and names -> character ID, first character wins.
+        # Characters without a name are only reachable by ID, so a bare
+        # "(V.O.):" line can't map to an unnamed character.
+        self._name_to_id = {}
+        for cid, cdata in self.characters.items():
+            self._name_to_id.setdefault(cid.upper(), cid)
+            if name := cdata.get('name'):
+                self._name_to_id.setdefault(name.upper(), cid)
         
         if show_id not in self.shows:
             raise ValueError(f"Show not found: {show_id}")
@@ -131,7 +212,7 @@ Write the full script:"""
         if not api_key:
             raise ValueError("Anthropic API key not found!")
         
-        response = requests.post(
+        response = SESSION.post(
             "https://api.anthropic.com/v1/messages",
             headers={
                 "x-api-key": api_key,
@@ -149,7 +230,7 @@ Write the full script:"""
         if response.status_code != 200:
             raise Exception(f"Claude API error: {response.status_code} - {response.text[:200]}")
         
-        script = response.json()["content"][0]["text"]
+        script = loads(response.content)["content"][0]["text"]
         
         with open(script_path, "w") as f:
             f.write(script)
@@ -182,16 +263,15 @@ Write the full script:"""
                 continue
             
             # Dialogue line (CHARACTER: text)
-            if ':' in line and line.split(':')[0].isupper():
-                parts = line.split(':', 1)
-                character = parts[0].strip()
-                text = parts[1].strip()
+            character, sep, text = line.partition(':')
+            if sep and character.isupper():
+                character = character.strip()
+                text = text.strip()
                 
                 # Remove stage directions from text
                 if '(' in text and ')' in text:
                     # Keep text after stage direction
-                    import re
-                    text = re.sub(r'\([^)]*\)\s*', '', text).strip()
+                    text = _STAGE_DIR_RE.sub('', text).strip()
                 
                 if text:
                     # Check if V.O.
@@ -199,11 +279,7 @@ Write the full script:"""
                     char_name = character.replace('(V.O.)', '').replace('V.O.', '').strip()
                     
                     # Map character name to ID
-                    char_id = None
-                    for cid, cdata in self.characters.items():
-                        if cdata.get('name', '').upper() == char_name.upper() or cid.upper() == char_name.upper():
-                            char_id = cid
-                            break
+                    char_id = self._name_to_id.get(char_name.upper())
                     
                     if char_id:
                         lines.append({
@@ -224,14 +300,22 @@ Write the full script:"""
         audio_dir = self.production_dir / "audio"
         audio_dir.mkdir(exist_ok=True)
         
+        # A complete manifest for this exact dialogue means nothing is left to do
+        manifest_path = audio_dir / "manifest.json"
+        dialogue_digest = hashlib.sha1(dumps(dialogue_lines)).hexdigest()
+        if self._audio_complete(manifest_path, dialogue_digest):
+            print("   ✓ Audio already generated")
+            return audio_dir
+        
         # Save dialogue lines
-        save_json(audio_dir / "dialogue_lines.json", dialogue_lines)
+        save_json(audio_dir / "dialogue_lines.json", dialogue_lines, pretty=True)
         
         hume_key = get_api_key("hume")
         if not hume_key:
             raise ValueError("Hume API key not found!")
         
         generated = []
+        jobs = []
         
         for line in dialogue_lines:
             idx = line["idx"]
@@ -253,78 +337,142 @@ Write the full script:"""
                 continue
             
             print(f"   [{idx:03d}] {char_id}: {text[:40]}...")
-            
-            # Call Hume TTS API
-            try:
-                response = requests.post(
-                    "https://api.hume.ai/v0/tts",
-                    headers={
-                        "X-Hume-Api-Key": hume_key,
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "voice": {"id": voice_id},
-                        "text": text
-                    },
-                    timeout=60
-                )
-                
-                if response.status_code == 200:
-                    # Response is base64 audio
-                    import base64
-                    audio_data = response.json().get("audio")
-                    if audio_data:
-                        with open(output_path, "wb") as f:
-                            f.write(base64.b64decode(audio_data))
+            jobs.append((line, voice_id, output_path))
+        
+        # Call Hume TTS API concurrently, rate limited across workers
+        if jobs:
+            limiter = RateLimiter(HUME_REQUESTS_PER_SEC)
+            with ThreadPoolExecutor(max_workers=HUME_WORKERS) as pool:
+                futures = {
+                    pool.submit(self._tts_one, line["text"], voice_id, hume_key, output_path, limiter): line
+                    for line, voice_id, output_path in jobs
+                }
+                for future in as_completed(futures):
+                    line = futures[future]
+                    label = f"   [{line['idx']:03d}] {line['character']}"
+                    try:
+                        output_path = future.result()
+                    except Exception as e:
+                        print(f"{label}: ✗ Exception: {e}")
+                        continue
+                    if output_path:
                         generated.append(output_path)
-                        print(f"         ✓ Saved")
-                else:
-                    print(f"         ✗ Error: {response.status_code}")
-                
-                time.sleep(0.5)  # Rate limiting
-                
-            except Exception as e:
-                print(f"         ✗ Exception: {e}")
+                        print(f"{label}: ✓ Saved")
         
         print(f"   ✓ Generated {len(generated)} audio files")
         
         # Combine audio
         if generated:
             self.combine_audio(generated, audio_dir / "combined.mp3")
+            save_json(manifest_path, {
+                "version": MANIFEST_VERSION,
+                "dialogue": dialogue_digest,
+                "complete": len(generated) == len(dialogue_lines),
+                "generated": sorted(p.name for p in generated)
+            }, pretty=True)
         
         return audio_dir
     
+    def _audio_complete(self, manifest_path, dialogue_digest):
+        """True if a previous run voiced every line of this dialogue and its files are intact."""
+        manifest = load_json(manifest_path)
+        if (manifest.get("version") != MANIFEST_VERSION or not manifest.get("complete")
+                or manifest.get("dialogue") != dialogue_digest):
+            return False
+        audio_dir = manifest_path.parent
+        try:
+            if not (audio_dir / "combined.mp3").exists():
+                return False
+            return all((audio_dir / name).stat().st_size > 1000 for name in manifest["generated"])
+        except FileNotFoundError:
+            return False
+    
+    def _tts_one(self, text, voice_id, hume_key, output_path, limiter):
+        """Synthesize one line with Hume TTS. Returns the saved path, or None if no audio came back."""
+        limiter.acquire()
+        response = SESSION.post(
+            "https://api.hume.ai/v0/tts",
+            headers={
+                "X-Hume-Api-Key": hume_key,
+                "Content-Type": "application/json"
+            },
+            json={
+                "voice": {"id": voice_id},
+                "text": text
+            },
+            timeout=60,
+            stream=True
+        )
+        
+        with response:
+            if response.status_code != 200:
+                raise Exception(f"Hume API error: {response.status_code}")
+            
+            # Raw audio body: copy it to a .tmp sibling chunk by chunk and only
+            # move it into place once complete, so the resume check never
+            # mistakes a dropped stream for a finished line
+            if response.headers.get("Content-Type", "").startswith("audio/"):
+                tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+                with open(tmp_path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        f.write(chunk)
+                os.replace(tmp_path, output_path)
+                return output_path
+            
+            # JSON body with base64 audio
+            audio_data = loads(response.content).get("audio")
+        
+        if not audio_data:
+            return None
+        write_bytes_atomic(output_path, base64.b64decode(audio_data))
+        return output_path
+    
     def combine_audio(self, audio_files, output_path):
         """Combine audio files with small gaps."""
         print("   Combining audio...")
         
-        concat_file = output_path.parent / "concat_list.txt"
-        silence_file = output_path.parent / "silence.mp3"
-        
-        # Create short silence
-        subprocess.run([
-            "ffmpeg", "-y", "-f", "lavfi", "-i", "anullsrc=r=44100:cl=mono",
-            "-t", "0.3", "-q:a", "9", str(silence_file)
-        ], capture_output=True)
-        
-        with open(concat_file, "w") as f:
-            for i, audio in enumerate(sorted(audio_files)):
-                f.write(f"file '{audio.absolute()}'\n")
-                if i < len(audio_files) - 1:
-                    f.write(f"file '{silence_file.absolute()}'\n")
-        
-        subprocess.run([
-            "ffmpeg", "-y", "-f", "concat", "-safe", "0",
-            "-i", str(concat_file),
-            "-c:a", "libmp3lame", "-q:a", "2",
-            str(output_path)
-        ], capture_output=True)
-        
-        concat_file.unlink()
-        silence_file.unlink()
+        audio_files = sorted(audio_files)
+        
+        if len(audio_files) <= MAX_FILTER_INPUTS:
+            self._concat_with_gaps(audio_files, output_path)
+        else:
+            # Very long dialogues: stitch lossless batches first so ffmpeg
+            # never holds hundreds of inputs open, then join the batches
+            parts = []
+            for start in range(0, len(audio_files), MAX_FILTER_INPUTS):
+                part = output_path.parent / f"part_{start // MAX_FILTER_INPUTS:03d}.wav"
+                self._concat_with_gaps(audio_files[start:start + MAX_FILTER_INPUTS], part, codec=["-c:a", "pcm_s16le"])
+                parts.append(part)
+            self._concat_with_gaps(parts, output_path)
+            for part in parts:
+                part.unlink(missing_ok=True)
         
         print(f"   ✓ Combined audio: {output_path}")
     
+    def _concat_with_gaps(self, audio_files, output_path, codec=None):
+        """One ffmpeg pass: decode every input, pad in the gaps, encode once."""
+        cmd = ["ffmpeg", "-y"]
+        for audio in audio_files:
+            cmd += ["-i", str(audio)]
+        
+        # Every line but the last gets its trailing gap via apad, so the
+        # graph needs no silence sources and concat sees one segment per line
+        chains = []
+        last = len(audio_files) - 1
+        for i in range(len(audio_files)):
+            pad = f",apad=pad_dur={AUDIO_GAP}" if i < last else ""
+            chains.append(f"[{i}:a]aformat=sample_rates=44100:channel_layouts=mono{pad}[a{i}]")
+        segments = "".join(f"[a{i}]" for i in range(len(audio_files)))
+        chains.append(f"{segments}concat=n={len(audio_files)}:v=0:a=1[out]")
+        
+        cmd += [
+            "-filter_complex", ";".join(chains),
+            "-map", "[out]",
+            *(codec or ["-c:a", "libmp3lame", "-q:a", "2"]),
+            str(output_path)
+        ]
+        subprocess.run(cmd, capture_output=True)
+    
     def generate_video(self, audio_path):
         """Generate video using LTX (Forge pipeline)."""
         print("🎥 Step 3: Generating Video...")
@@ -355,16 +503,17 @@ Write the full script:"""
         
         return clips_dir
     
-    def run(self):
-        """Run the full production pipeline."""
+    def run(self, script_path=None):
+        """Run the full production pipeline. A script generated ahead of time can be passed in."""
         print("=" * 60)
         print("🎬 THE SHOW RUNNER - Production Pipeline")
         print("=" * 60)
         print()
         
         # Step 1: Generate script
-        script_path = self.generate_script()
-        print()
+        if script_path is None:
+            script_path = self.generate_script()
+            print()
         
         # Parse script
         dialogue_lines = self.parse_script(script_path)
@@ -387,17 +536,34 @@ Write the full script:"""
         print("=" * 60)
         print(f"Output: {self.production_dir}")
 
+def run_batch(show_id, episode_idxs):
+    """
+    Produce several episodes in one process. While one episode is voiced and
+    stitched, the next episode's script is already being written by Claude,
+    hiding one script round trip per episode boundary.
+    """
+    runners = [ShowRunner(show_id, idx) for idx in episode_idxs]
+    
+    with ThreadPoolExecutor(max_workers=1) as prefetch:
+        next_script = prefetch.submit(runners[0].generate_script)
+        for i, runner in enumerate(runners):
+            script_path = next_script.result()
+            if i + 1 < len(runners):
+                next_script = prefetch.submit(runners[i + 1].generate_script)
+            runner.run(script_path)
+
 def main():
     parser = argparse.ArgumentParser(description="The Show Runner - Production Pipeline")
     parser.add_argument("--show", help="Show ID")
     parser.add_argument("--episode", type=int, default=0, help="Episode index")
+    parser.add_argument("--episodes", help="Comma-separated episode indexes to produce as a batch")
     parser.add_argument("--config", help="Production config JSON file")
     parser.add_argument("--list", action="store_true", help="List available shows")
     
     args = parser.parse_args()
     
     if args.list:
-        shows = load_json(DATA_DIR / "shows.json", {})
+        shows = load_data(DATA_DIR / "shows.json")
         print("Available shows:")
         for sid, show in shows.items():
             print(f"  {sid}: {show.get('title')} ({len(show.get('episodes', []))} episodes)")
@@ -413,6 +579,10 @@ def main():
         parser.print_help()
         sys.exit(1)
     
+    if args.episodes:
+        run_batch(args.show, [int(idx) for idx in args.episodes.split(",")])
+        return
+    
     runner = ShowRunner(args.show, args.episode)
     runner.run()
 
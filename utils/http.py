@@ -0,0 +1,73 @@
+"""
+🌐 Pooled HTTP sessions for the app pages.
+Page scripts re-run top to bottom, so sessions live in st.cache_resource
+to keep HTTPS connections to Anthropic/Hume/LTX alive across clicks.
+"""
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+from utils.serialization import dumps, loads
+
+ANTHROPIC_URL = "https://api.anthropic.com/v1/messages"
+
+
+@st.cache_resource(show_spinner=False)
+def http_session():
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    return session
+
+
+@st.cache_resource(show_spinner=False)
+def anthropic_session(api_key):
+    session = requests.Session()
+    session.headers.update({
+        "x-api-key": api_key,
+        "content-type": "application/json",
+        "anthropic-version": "2023-06-01"
+    })
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+    return session
+
+
+def anthropic_messages(api_key, payload, timeout=120, **kwargs):
+    """POST a Messages API payload, serialized with orjson, over the pooled session."""
+    return anthropic_session(api_key).post(ANTHROPIC_URL, data=dumps(payload), timeout=timeout, **kwargs)
+
+
+def anthropic_stream(api_key, payload, timeout=120):
+    """Open a streaming Messages request; check status_code before iterating."""
+    return anthropic_messages(api_key, {**payload, "stream": True}, timeout=timeout, stream=True)
+
+
+class StreamError(Exception):
+    """The SSE stream reported an error or ended before message_stop."""
+
+
+def iter_text_deltas(response):
+    """
+    Yield the text deltas from an Anthropic SSE stream as they arrive.
+    Raises StreamError on an error event or a stream cut short, so callers
+    never mistake partial text for a finished message.
+    """
+    completed = False
+    with response:
+        try:
+            for line in response.iter_lines():
+                if not line.startswith(b"data:"):
+                    continue
+                event = loads(line[5:])
+                event_type = event.get("type")
+                if event_type == "content_block_delta" and event["delta"].get("type") == "text_delta":
+                    yield event["delta"]["text"]
+                elif event_type == "message_stop":
+                    completed = True
+                elif event_type == "error":
+                    error = event.get("error", {})
+                    raise StreamError(f"{error.get('type', 'error')}: {error.get('message', '')}")
+        except requests.RequestException as e:
+            raise StreamError(f"connection lost: {e}") from e
+    if not completed:
+        raise StreamError("stream ended before the message was complete")
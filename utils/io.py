@@ -0,0 +1,44 @@
+"""
+Streamlit-side JSON I/O for the app pages.
+Wraps utils.serialization's journaled files (snapshot + .jsonl sidecar)
+with an st.cache_data loader keyed on both mtimes.
+"""
+
+from pathlib import Path
+
+import streamlit as st
+
+from utils.serialization import (
+    journal_delete,
+    journal_path,
+    journal_upsert,
+    load_journaled,
+)
+
+
+def _mtime_ns(path):
+    return path.stat().st_mtime_ns if path.exists() else 0
+
+
+@st.cache_data(show_spinner=False)
+def _load_journaled_cached(path_str, mtime_ns, log_mtime_ns):
+    return load_journaled(Path(path_str))
+
+
+def journal_version(path):
+    """Cache key that changes whenever the snapshot or its journal does."""
+    return _mtime_ns(path), _mtime_ns(journal_path(path))
+
+
+def load_cached_journaled(path):
+    return _load_journaled_cached(str(path), *journal_version(path))
+
+
+def upsert_entry(path, key, value):
+    journal_upsert(path, key, value)
+    _load_journaled_cached.clear()
+
+
+def delete_entry(path, key):
+    journal_delete(path, key)
+    _load_journaled_cached.clear()
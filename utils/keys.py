@@ -0,0 +1,53 @@
+"""
+🔑 API key lookup shared by the app pages.
+Streamlit secrets first (cloud deployment), then ~/clawd/.secrets/<service>.json
+for local development. Page scripts re-run on every interaction, so every
+key that was found lives in st.cache_resource.
+Misses are never cached: a key added to Secrets or .secrets/ is picked up
+on the next rerun without restarting the server.
+"""
+
+import os
+from pathlib import Path
+
+import streamlit as st
+
+from utils.serialization import load_json
+
+
+# Resolved once at import; existence is checked on each miss
+SECRETS_DIR = Path(os.path.expanduser("~/clawd/.secrets"))
+
+
+# cache_resource keeps keys out of the pickled cache_data store
+@st.cache_resource(show_spinner=False)
+def _found_keys():
+    return {}
+
+
+def _lookup_api_key(service):
+    # Streamlit raises StreamlitSecretNotFoundError (a FileNotFoundError) both
+    # when no secrets.toml exists and when one fails to parse. Only the first
+    # means "fall back to local files"; a broken secrets file is re-raised.
+    try:
+        key = st.secrets.get("api_keys", {}).get(service)
+    except FileNotFoundError:
+        if any(Path(path).exists() for path in st.get_option("secrets.files")):
+            raise
+        key = None
+    if key:
+        return key
+
+    data = load_json(SECRETS_DIR / f"{service}.json")
+    return data.get("api_key") or data.get("key")
+
+
+def get_api_key(service):
+    """Get API key from Streamlit secrets or local files"""
+    found = _found_keys()
+    key = found.get(service)
+    if not key:
+        key = _lookup_api_key(service)
+        if key:
+            found[service] = key
+    return key
@@ -0,0 +1,28 @@
+"""
+🎭 Typed records for the roster.
+Plain slotted dataclasses; characters.json itself stays a dict of dicts.
+"""
+
+from dataclasses import dataclass, fields
+
+
+@dataclass(slots=True)
+class Character:
+    id: str
+    name: str = ""
+    role: str = ""
+    description: str = ""
+    voice_provider: str = "none"
+    voice_id: str = ""
+
+    @classmethod
+    def from_dict(cls, char_id, data):
+        known = {k: v for k, v in data.items() if k in _CHARACTER_FIELDS and v is not None}
+        return cls(id=char_id, **known)
+
+    @property
+    def display_name(self):
+        return self.name or self.id
+
+
+_CHARACTER_FIELDS = {f.name for f in fields(Character)} - {"id"}
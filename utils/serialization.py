@@ -0,0 +1,118 @@
+"""
+JSON helpers shared by the app pages.
+Uses orjson when available, falling back to the stdlib json module.
+"""
+
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(data, pretty=False):
+    """Serialize to UTF-8 bytes, compact unless pretty is set."""
+    if orjson is not None:
+        # NON_STR_KEYS matches json.dumps, which stringifies int/float/bool keys
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode()
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def load_json(path, default=None):
+    if path.exists():
+        return loads(path.read_bytes())
+    return default or {}
+
+
+def save_json(path, data, pretty=False):
+    """
+    Write atomically, skipping the write when the file already matches.
+    Auto-saves stay compact; pass pretty=True for files meant to be read by hand.
+    """
+    new_bytes = dumps(data, pretty)
+    if path.exists() and path.read_bytes() == new_bytes:
+        return
+    write_bytes_atomic(path, new_bytes)
+
+
+def write_bytes_atomic(path, data):
+    """Write to a sibling .tmp file and os.replace it in, so readers never see a torn file."""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def write_text_atomic(path, text):
+    write_bytes_atomic(path, text.encode("utf-8"))
+
+
+# 📓 Append-only journal: a .jsonl sidecar of upsert/delete events
+# replayed over the .json snapshot, so single-record edits append
+# one line instead of rewriting the whole file.
+
+def journal_path(path):
+    return path.with_suffix(".jsonl")
+
+
+def load_journaled(path, default=None):
+    """Load the snapshot at path and replay its journal on top."""
+    data = load_json(path, default)
+    log_path = journal_path(path)
+    if not log_path.exists():
+        return data
+    with open(log_path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                event = loads(line)
+            except ValueError:
+                continue  # torn line from an interrupted append
+            if event["op"] == "upsert":
+                data[event["id"]] = event["data"]
+            elif event["op"] == "delete":
+                data.pop(event["id"], None)
+    return data
+
+
+def _append_event(path, event):
+    with open(journal_path(path), "a+b") as f:
+        record = dumps(event) + b"\n"
+        if f.seek(0, os.SEEK_END):
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                # Terminate a torn tail so this event starts on its own line
+                record = b"\n" + record
+        f.write(record)
+    log_size = journal_path(path).stat().st_size
+    if not path.exists() or log_size > path.stat().st_size:
+        compact_journal(path)
+
+
+def compact_journal(path):
+    """Fold the journal into the snapshot and drop it."""
+    log_path = journal_path(path)
+    if log_path.exists():
+        save_json(path, load_journaled(path))
+        log_path.unlink()
+
+
+def journal_upsert(path, key, value):
+    _append_event(path, {"op": "upsert", "id": key, "data": value})
+
+
+def journal_delete(path, key):
+    _append_event(path, {"op": "delete", "id": key})
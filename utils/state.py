@@ -0,0 +1,45 @@
+"""
+📦 Shared app data: the character roster and the shows collection.
+Reads go through the mtime-keyed journal cache, so every page and session
+shares one parsed copy per file version; writes append a journal event.
+"""
+
+from pathlib import Path
+
+from utils.io import delete_entry, journal_version, load_cached_journaled, upsert_entry
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+CHARACTERS_FILE = DATA_DIR / "characters.json"
+SHOWS_FILE = DATA_DIR / "shows.json"
+
+
+def get_characters():
+    return load_cached_journaled(CHARACTERS_FILE)
+
+
+def characters_version():
+    return journal_version(CHARACTERS_FILE)
+
+
+def upsert_character(char_id, char):
+    upsert_entry(CHARACTERS_FILE, char_id, char)
+
+
+def delete_character(char_id):
+    delete_entry(CHARACTERS_FILE, char_id)
+
+
+def get_shows():
+    return load_cached_journaled(SHOWS_FILE)
+
+
+def shows_version():
+    return journal_version(SHOWS_FILE)
+
+
+def update_show(show_id, show):
+    upsert_entry(SHOWS_FILE, show_id, show)
+
+
+def delete_show(show_id):
+    delete_entry(SHOWS_FILE, show_id)